@@ -2,7 +2,7 @@ import argparse
 
 from inference.opencv import VideoReader, ImageReader, WEBCAM
 from inference.opencv import Writer
-from inference.dataset import DavidDataset
+from inference.dataset import PairedSource
 
 
 def parse_args():
@@ -18,14 +18,26 @@ def main():
     args = parse_args()
     args.source = '/home/vv-team/vv-dataset/office/justco_cafe'
     reader = ImageReader(args.source)
-    dataset = DavidDataset(path=args.source, padding_size=args.padding_size) if args.json_format == 'david' else None
+    source = PairedSource(args.source, padding_size=args.padding_size) if args.json_format == 'david' else None
     writer = Writer(reader=reader, output_dir=args.output_dir)
+    if source is not None and (source.missing_images or source.missing_annotations):
+        print(f"Skipping {len(source.missing_images)} annotations without image and "
+              f"{len(source.missing_annotations)} images without annotation")
 
-    for frame, data in zip(reader, dataset):
+    # without annotations, frames are shown as they are
+    pairs = source if source is not None else ((frame, []) for frame in reader)
+    for frame, data in pairs:
+        # images that failed to decode
+        if frame is None:
+            continue
         for person in data:
             writer.draw_bbox(frame, person.full.xyxy, str(person.id), person.id)
             writer.draw_key_points(frame, person.key_point)
-        reader.show(frame)
+        # 'q' closes the window, the reader is not what is being iterated
+        if not reader.show(frame):
+            break
+    if source is not None:
+        source.release()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
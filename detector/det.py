@@ -5,7 +5,7 @@ import numpy as np
 class Det:
     def __init__(self, filter_cls: list[int], pred: np.ndarray):
         self.filter_cls = filter_cls
-        filtered_idx = np.in1d(pred[:, 5], filter_cls)
+        filtered_idx = np.isin(pred[:, 5], filter_cls)
 
         if len(filtered_idx) > 0 :
             self.pred = pred[filtered_idx]
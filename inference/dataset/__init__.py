@@ -1,2 +1,5 @@
 from .david import DavidDataset
-from .data_class import Box, Person
\ No newline at end of file
+from .data_class import Box, Person, FramePeople
+from .david_cache import DavidCache, default_cache_dir
+from .track_index import TrackIndex
+from .paired import PairedSource
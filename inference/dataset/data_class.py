@@ -1,22 +1,168 @@
 from __future__ import annotations
-from dataclasses import dataclass
 
-@dataclass
+import numpy as np
+
+from inference.utils import sorted_alphanumeric
+
+BOX_NAMES = ('visible', 'full', 'head')
+
+
 class Box:
-    x0: int
-    y0: int
-    w: int
-    h: int
-    padding: tuple[int, int] = (0, 0)
+    """Slotted box, xywh and xyxy are computed on access instead of stored"""
+    __slots__ = ('x0', 'y0', 'w', 'h', 'padding')
+
+    def __init__(self, x0: int, y0: int, w: int, h: int, padding: tuple[int, int] = (0, 0)):
+        self.x0 = x0
+        self.y0 = y0
+        self.w = w
+        self.h = h
+        self.padding = padding
+
+    @property
+    def xywh(self) -> tuple[int, int, int, int]:
+        return (self.x0, self.y0, self.w, self.h)
+
+    @property
+    def xyxy(self) -> tuple[int, int, int, int]:
+        return (self.x0, self.y0, self.x0 + self.w, self.y0 + self.h)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Box):
+            return NotImplemented
+        return self.xywh == other.xywh and tuple(self.padding) == tuple(other.padding)
+
+    def __repr__(self) -> str:
+        return f'Box(x0={self.x0}, y0={self.y0}, w={self.w}, h={self.h}, padding={self.padding})'
 
-    def __post_init__(self):
-        self.xywh = (self.x0, self.y0, self.w, self.h)
-        self.xyxy = (self.x0, self.y0, self.x0 + self.w, self.y0 + self.h)
 
-@dataclass
 class Person:
-    id: int
-    visible: Box
-    full: Box
-    head: Box
-    key_point: list[tuple[int, int]]
\ No newline at end of file
+    """Slotted person of one frame"""
+    __slots__ = ('id', 'visible', 'full', 'head', 'key_point')
+
+    def __init__(self, id: int, visible: Box, full: Box, head: Box,
+                 key_point: dict[str, tuple[int, int]]):
+        self.id = id
+        self.visible = visible
+        self.full = full
+        self.head = head
+        self.key_point = key_point
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Person):
+            return NotImplemented
+        return (self.id, self.visible, self.full, self.head, self.key_point) == \
+            (other.id, other.visible, other.full, other.head, other.key_point)
+
+    def __repr__(self) -> str:
+        return (f'Person(id={self.id}, visible={self.visible}, full={self.full}, '
+                f'head={self.head}, key_point={self.key_point})')
+
+
+class FramePeople:
+    """
+    People of one frame stored as a handful of arrays, Person objects are
+    only built when indexed or iterated.
+    Arrays can be views into a shared buffer (e.g. a memory-mapped DavidCache).
+    """
+    __slots__ = ('ids', 'boxes', 'key_points', 'key_point_names', 'key_point_mask')
+
+    def __init__(self, ids: np.ndarray, boxes: np.ndarray, key_points: np.ndarray,
+                 key_point_names: list[str], key_point_mask: np.ndarray | None = None):
+        """
+        Args:
+            ids (np.ndarray): (N,) track ids
+            boxes (np.ndarray): (N, 3, 4) xywh boxes in visible/full/head order
+            key_points (np.ndarray): (N, K, 2) key points
+            key_point_names (list[str]): K key point names
+            key_point_mask (np.ndarray | None): (N, K) presence of each key point,
+                defaults to the points that are not NaN
+        """
+        self.ids = ids
+        self.boxes = boxes
+        self.key_points = key_points
+        self.key_point_names = key_point_names
+        if key_point_mask is None:
+            key_point_mask = ~np.isnan(key_points).any(-1) if key_points.dtype.kind == 'f' \
+                else np.ones(key_points.shape[:2], dtype=bool)
+        self.key_point_mask = key_point_mask
+
+    @staticmethod
+    def from_people(people: list[Person]) -> "FramePeople":
+        """Pack Person objects into arrays, int values are kept as int32
+        Args:
+            people (list[Person]): people of one frame
+        Returns:
+            FramePeople: array-backed frame
+        """
+        names = sorted_alphanumeric(list({name for person in people for name in person.key_point}))
+        columns = {name: i for i, name in enumerate(names)}
+        ids = np.array([person.id for person in people], dtype=np.int64)
+        xywh = [[getattr(person, field).xywh for field in BOX_NAMES] for person in people]
+        box_dtype = np.int32 if all(type(v) is int for boxes in xywh for box in boxes for v in box) \
+            else np.float64
+        key_point_dtype = np.int32 if all(type(v) is int for person in people
+                                          for xy in person.key_point.values() for v in xy) else np.float64
+
+        boxes = np.array(xywh, dtype=box_dtype).reshape(-1, len(BOX_NAMES), 4)
+        key_points = np.zeros((len(people), len(names), 2), dtype=key_point_dtype)
+        key_point_mask = np.zeros((len(people), len(names)), dtype=bool)
+        for row, person in enumerate(people):
+            for name, xy in person.key_point.items():
+                key_points[row, columns[name]] = xy
+                key_point_mask[row, columns[name]] = True
+        return FramePeople(ids, boxes, key_points, names, key_point_mask)
+
+    def key_point_array(self) -> np.ndarray:
+        """Key points for drawing, see draw_key_points
+        Returns:
+            np.ndarray: (N, K, 2) float key points, NaN for missing points
+        """
+        return np.where(self.key_point_mask[..., None], self.key_points, np.nan).astype(np.float32)
+
+    def xywh(self, field: str = 'full') -> np.ndarray:
+        """Boxes of one kind
+        Args:
+            field (str): 'visible', 'full' or 'head'
+        Returns:
+            np.ndarray: (N, 4) xywh boxes
+        """
+        return self.boxes[:, BOX_NAMES.index(field)]
+
+    def xyxy(self, field: str = 'full') -> np.ndarray:
+        """Boxes of one kind
+        Args:
+            field (str): 'visible', 'full' or 'head'
+        Returns:
+            np.ndarray: (N, 4) xyxy boxes
+        """
+        xyxy = np.array(self.xywh(field), dtype=np.float64)
+        xyxy[:, 2:] += xyxy[:, :2]
+        return xyxy
+
+    def person(self, index: int) -> Person:
+        """Build the Person of one row
+        """
+        visible, full, head = self.boxes[index].tolist()
+        points = zip(self.key_point_names, self.key_points[index].tolist(), self.key_point_mask[index].tolist())
+        key_point = {name: (x, y) for name, (x, y), present in points if present}
+        return Person(int(self.ids[index]), Box(*visible), Box(*full), Box(*head), key_point)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int | slice) -> Person | "FramePeople":
+        if isinstance(index, slice):
+            return FramePeople(self.ids[index], self.boxes[index], self.key_points[index], self.key_point_names,
+                               self.key_point_mask[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.person(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.person(index)
+
+    def __repr__(self) -> str:
+        return f'<FramePeople: {len(self)} people>'
@@ -1,15 +1,81 @@
 from __future__ import annotations
 import os
 import json
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 import numpy as np
 
 from inference.utils.sorting import get_sorted_alpanumeric_files
-from .data_class import Box, Person
+from .data_class import Box, Person, FramePeople
+from .david_cache import DavidCache, default_cache_dir
+from .track_index import TrackIndex
+
+
+def get_box_output(rows: dict[str, str], filed_name: str, padding_size: tuple[int, int]) -> Box:
+    box = rows.get(filed_name, {}).get('box')
+    if box:
+        xywh = (box['x'] - padding_size[0],
+                box['y'] - padding_size[1],
+                box['width'],
+                box['height'])
+        return Box(*xywh)
+    return Box(0, 0, 0, 0)
+
+
+def aggregate_rows(data: list[dict], padding_size: tuple[int, int]) -> list[Person]:
+    """Build Person objects from the raw json rows of one frame
+    """
+    people = []
+    for rows in data:
+        track_id = rows.get('tracking_id')
+        if track_id:
+            track_id = int(track_id)
+            visible = get_box_output(rows, 'visible-box', padding_size)
+            head = get_box_output(rows, 'head-box', padding_size)
+            full = get_box_output(rows, 'full-box', padding_size)
+
+            body_key_points = {k: (v['x'], v['y']) for k, v in rows.get('body-key-points', {}).items()}
+
+            people.append(Person(track_id, visible, full, head, body_key_points))
+    return people
+
+
+def load_frame(file: str, padding_size: tuple[int, int]) -> list[Person]:
+    """Parse and aggregate one annotation file, runs on prefetch workers
+    """
+    with open(file) as f:
+        data = json.load(f)
+    return aggregate_rows(data, padding_size)
+
 
 class DavidDataset:
-    def __init__(self, path: str, padding_size: tuple[int, int] | list[int, int] | None = None):
+    def __init__(self, path: str, padding_size: tuple[int, int] | list[int, int] | None = None,
+                 manifest_path: str | None = None, prefetch: int = 0, workers: int | None = None,
+                 executor: str = 'thread', compiled: bool = False, cache_dir: str | None = None,
+                 cache_size: int = 128):
+        """Initiate DavidDataset object
+        Args:
+            path (str): directory of per-frame json files
+            padding_size (tuple[int, int] | None): padding subtracted from box coordinates
+            manifest_path (str | None): file used to persist the directory listing between runs
+            prefetch (int): number of upcoming frames parsed ahead on a worker pool, 0 disables it
+            workers (int | None): size of the worker pool, defaults to the executor's default
+            executor (str): 'thread' or 'process', processes avoid the GIL for json parsing
+            compiled (bool): read people from a memory-mapped DavidCache, compiled on first use
+                and rebuilt whenever the json files change
+            cache_dir (str | None): directory of the compiled cache, defaults to a per-dataset
+                directory under the user cache (see default_cache_dir), never inside path
+            cache_size (int): parsed frames kept in the LRU used by random access, 0 disables it
+        """
         self._init_props()
+        self._manifest_path = manifest_path
+        self._prefetch = prefetch
+        self._workers = workers
+        self._executor_type = executor
+        self._compiled = compiled
+        self._cache_dir = default_cache_dir(path) if cache_dir is None else cache_dir
+        self._cache_size = cache_size
         self._post_init(path, padding_size)
 
     def _init_props(self):
@@ -20,18 +86,36 @@ class DavidDataset:
         self._name = None
         self._data = None
         self._frame_count = 0
+        self._manifest_path = None
+        self._prefetch = 0
+        self._workers = None
+        self._executor_type = 'thread'
+        self._executor = None
+        self._pending = deque()
+        self._next_prefetch = 0
+        self._compiled = False
+        self._cache_dir = None
+        self._cache = None
+        self._track_index = None
+        self._cache_size = 128
+        self._frames = OrderedDict()
 
     def _post_init(self, path: str, padding_size: tuple[int, int] | list[int, int] | None = None):
         """Update info property
         """
-        self._files = get_sorted_alpanumeric_files(path, ['json'])
+        self._files = get_sorted_alpanumeric_files(path, ['json'], self._manifest_path)
         self._num_files = len(self._files)
         self._padding_size = (0,0) if padding_size is None else padding_size
+        if self._compiled:
+            workers = self._workers if self._executor_type == 'process' else None
+            self._cache = DavidCache.open(self._files, self._cache_dir, workers)
         self._info = {
             "name": None,
             "frame_count": 0,
             "padding_size": self._padding_size,
             "num_files": self._num_files,
+            "prefetch": self._prefetch,
+            "compiled": self._compiled,
         }
     
     @property
@@ -50,6 +134,29 @@ class DavidDataset:
     def data(self) -> dict[str, str]:
         return self._data
 
+    @property
+    def cache(self) -> DavidCache | None:
+        """Compiled annotation cache
+        Returns:
+            DavidCache | None: the cache when compiled=True, None otherwise
+        """
+        return self._cache
+
+    @property
+    def track_index(self) -> TrackIndex:
+        """Inverted index from tracking id to (frame, row) positions, stored next to the
+        compiled cache. The cache is compiled on first use when compiled=False
+        Returns:
+            TrackIndex: index of the sequence
+        """
+        if self._track_index is None:
+            cache = self._cache
+            if cache is None:
+                workers = self._workers if self._executor_type == 'process' else None
+                cache = DavidCache.open(self._files, self._cache_dir, workers)
+            self._track_index = TrackIndex.open(cache)
+        return self._track_index
+
     def load_data(self):
         with open(self._files[self._frame_count]) as f:
             data = json.load(f)
@@ -57,41 +164,93 @@ class DavidDataset:
         self._data = data
     
     def aggregate(self):
-        def get_box_output(rows: dict[str,str], filed_name: str) -> Box:
-            box = rows.get(filed_name, {}).get('box')
-            if box:
-                xywh = (box['x'] - self._padding_size[0],
-                        box['y'] - self._padding_size[1], 
-                        box['width'],
-                        box['height'])
-                return Box(*xywh)
-            return Box(0,0,0,0)
-            
         aggregated = {'name': self.name, 'frame': self.frame_count}
-        aggregated['data'] = []
-        
-        for rows in self._data:
-            track_id = rows.get('tracking_id')
-            if track_id:
-                track_id = int(track_id)
-                visible = get_box_output(rows, 'visible-box')
-                head = get_box_output(rows, 'head-box')
-                full = get_box_output(rows, 'full-box')
-
-                body_key_points = {k:(v['x'],v['y']) for k,v in rows.get('body-key-points', {}).items()}
-                
-                aggregated['data'].append(Person(track_id, visible, full, head, body_key_points))
-            
+        aggregated['data'] = aggregate_rows(self._data, self._padding_size)
         self._data = aggregated
 
+    def _start_prefetch(self):
+        """Create the worker pool and reset the look-ahead window
+        """
+        self._stop_prefetch()
+        if self._executor_type == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='DavidDataset')
+        self._next_prefetch = self._frame_count
+
+    def _stop_prefetch(self):
+        """Drop pending frames and shut the worker pool down
+        """
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _next_prefetched(self) -> list[Person]:
+        """Returns the next frame from the look-ahead window, in order
+        """
+        while len(self._pending) < self._prefetch and self._next_prefetch < self._num_files:
+            file = self._files[self._next_prefetch]
+            self._pending.append(self._executor.submit(load_frame, file, self._padding_size))
+            self._next_prefetch += 1
+        return self._pending.popleft().result()
+
+    def release(self):
+        """Release Resources
+        """
+        self._stop_prefetch()
+
+    def __del__(self):
+        self._stop_prefetch()
+
     def __len__(self):
         return len(self._files)
     
-    def __getitem__(self, index: int) -> dict[str, str]:
+    def raw(self, index: int) -> list[dict]:
+        """Raw json rows of a frame
+        Args:
+            index (int): frame index
+        Returns:
+            list[dict]: rows as stored in the annotation file
+        """
         with open(self._files[index]) as f:
             data = json.load(f)
         return data
-    
+
+    def frame(self, index: int) -> list[Person] | FramePeople:
+        """Aggregated people of a frame, without touching the iteration state.
+        Parsed frames are kept in a bounded LRU, returned lists are shared and must not be modified.
+        Args:
+            index (int): frame index, negative values count from the end
+        Returns:
+            list[Person] | FramePeople: people of the frame
+        """
+        if index < 0:
+            index += self._num_files
+        if not 0 <= index < self._num_files:
+            raise IndexError(f"frame index {index} out of range")
+        if self._cache is not None:
+            return self._cache.people(index, self._padding_size)
+
+        people = self._frames.get(index)
+        if people is not None:
+            self._frames.move_to_end(index)
+            return people
+
+        people = load_frame(self._files[index], self._padding_size)
+        if self._cache_size > 0:
+            self._frames[index] = people
+            if len(self._frames) > self._cache_size:
+                self._frames.popitem(last=False)
+        return people
+
+    def __getitem__(self, index: int | slice) -> list[Person] | FramePeople | list[list[Person] | FramePeople]:
+        if isinstance(index, slice):
+            return [self.frame(i) for i in range(*index.indices(self._num_files))]
+        return self.frame(index)
+
     def __repr__(self):
         return f'<Dataset: {self.name}>'
     
@@ -100,11 +259,23 @@ class DavidDataset:
 
     def __iter__(self):
         self._frame_count = 0
+        if self._prefetch > 0 and self._cache is None:
+            self._start_prefetch()
         return self
 
     def __next__(self) -> dict[str, str]:
         if self._frame_count >= self._num_files:
             raise StopIteration
+        if self._cache is not None:
+            people = self._cache.people(self._frame_count, self._padding_size)
+            self._frame_count += 1
+            self._data = {'name': self.name, 'frame': self.frame_count, 'data': people}
+            return people
+        if self._executor is not None:
+            people = self._next_prefetched()
+            self._frame_count += 1
+            self._data = {'name': self.name, 'frame': self.frame_count, 'data': people}
+            return people
         self.load_data()
         self.aggregate()
         return self.data['data']
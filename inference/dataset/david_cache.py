@@ -0,0 +1,259 @@
+from __future__ import annotations
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from inference.utils import source_signature, sorted_alphanumeric
+from .data_class import FramePeople
+
+BOX_FIELDS = ('visible-box', 'full-box', 'head-box')
+_ARRAYS = ('ids', 'boxes', 'has_box', 'key_points', 'key_point_mask', 'frame_offsets')
+_INT32_MIN, _INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+# not .json, an explicit cache_dir may be the annotation directory, where every .json is a frame
+_META_FILE = 'david_cache.meta'
+
+
+def default_cache_dir(path: str) -> str:
+    """Per-dataset cache location under the user cache directory, never inside the
+    annotation directory, which may be read-only or shared
+    Args:
+        path (str): annotation directory
+    Returns:
+        str: $XDG_CACHE_HOME/inference/david/<hash of the absolute path>
+    """
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+    return os.path.join(root, 'inference', 'david', f'{os.path.basename(os.path.abspath(path))}-{key}')
+
+
+def _is_int(value) -> bool:
+    return type(value) is int and _INT32_MIN <= value <= _INT32_MAX
+
+
+def parse_file(file: str) -> tuple[list[int], list[list[list[float]]], list[list[bool]], list[dict], bool, bool]:
+    """Parse one annotation file into plain lists, runs on compile workers
+    Returns:
+        tuple: track ids, xywh boxes per BOX_FIELDS, box presence, key point dicts and
+        whether every box / key point value is an int
+    """
+    with open(file) as f:
+        data = json.load(f)
+
+    ids, boxes, has_box, key_points = [], [], [], []
+    int_boxes = int_key_points = True
+    for rows in data:
+        track_id = rows.get('tracking_id')
+        if not track_id:
+            continue
+        ids.append(int(track_id))
+        person_boxes, person_has = [], []
+        for field in BOX_FIELDS:
+            box = rows.get(field, {}).get('box')
+            person_has.append(bool(box))
+            xywh = [box['x'], box['y'], box['width'], box['height']] if box else [0, 0, 0, 0]
+            int_boxes = int_boxes and all(_is_int(v) for v in xywh)
+            person_boxes.append(xywh)
+        boxes.append(person_boxes)
+        has_box.append(person_has)
+        key_point = {k: (v['x'], v['y']) for k, v in rows.get('body-key-points', {}).items()}
+        int_key_points = int_key_points and all(_is_int(x) and _is_int(y) for x, y in key_point.values())
+        key_points.append(key_point)
+    return ids, boxes, has_box, key_points, int_boxes, int_key_points
+
+
+class DavidCache:
+    """
+    Compiled columnar form of a David annotation directory.
+    Every person of every frame is one row of fixed-dtype arrays (ids, visible/full/head
+    boxes, key points), frame_offsets maps frames to row ranges. Arrays are memory-mapped.
+    """
+    def __init__(self, cache_dir: str) -> None:
+        """Open a compiled cache
+        Args:
+            cache_dir (str): directory written by DavidCache.compile
+        """
+        with open(os.path.join(cache_dir, _META_FILE)) as f:
+            self._meta = json.load(f)
+        self._cache_dir = cache_dir
+        self._key_point_names = self._meta['key_point_names']
+        for name in _ARRAYS:
+            setattr(self, f'_{name}', np.load(os.path.join(cache_dir, f'{name}.npy'), mmap_mode='r'))
+
+    @staticmethod
+    def compile(files: list[str], cache_dir: str, workers: int | None = None) -> "DavidCache":
+        """Convert annotation files into a compiled cache
+        Args:
+            files (list[str]): sorted per-frame json files
+            cache_dir (str): output directory
+            workers (int | None): parse on a process pool of this size, None parses in-process
+        Returns:
+            DavidCache: the opened cache
+        """
+        signature = list(source_signature(files))
+        if workers:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = list(executor.map(parse_file, files, chunksize=64))
+        else:
+            parsed = [parse_file(file) for file in files]
+
+        counts = np.array([len(frame[0]) for frame in parsed], dtype=np.int64)
+        frame_offsets = np.zeros(len(files) + 1, dtype=np.int64)
+        np.cumsum(counts, out=frame_offsets[1:])
+        num_rows = int(frame_offsets[-1])
+
+        names = sorted_alphanumeric(list({name for frame in parsed for kp in frame[3] for name in kp}))
+        # int columns when the json only holds ints, so values come back exactly as aggregate_rows gives them
+        box_dtype = np.int32 if all(frame[4] for frame in parsed) else np.float64
+        key_point_dtype = np.int32 if all(frame[5] for frame in parsed) else np.float64
+        columns = {name: i for i, name in enumerate(names)}
+
+        ids = np.zeros(num_rows, dtype=np.int64)
+        boxes = np.zeros((num_rows, len(BOX_FIELDS), 4), dtype=box_dtype)
+        has_box = np.zeros((num_rows, len(BOX_FIELDS)), dtype=bool)
+        key_points = np.zeros((num_rows, len(names), 2), dtype=key_point_dtype)
+        key_point_mask = np.zeros((num_rows, len(names)), dtype=bool)
+        for (frame_ids, frame_boxes, frame_has, frame_kps, _, _), start in zip(parsed, frame_offsets[:-1].tolist()):
+            if not frame_ids:
+                continue
+            end = start + len(frame_ids)
+            ids[start:end] = frame_ids
+            boxes[start:end] = frame_boxes
+            has_box[start:end] = frame_has
+            for row, kp in enumerate(frame_kps, start):
+                for name, xy in kp.items():
+                    key_points[row, columns[name]] = xy
+                    key_point_mask[row, columns[name]] = True
+
+        os.makedirs(cache_dir, exist_ok=True)
+        arrays = {'ids': ids, 'boxes': boxes, 'has_box': has_box,
+                  'key_points': key_points, 'key_point_mask': key_point_mask, 'frame_offsets': frame_offsets}
+        for name, array in arrays.items():
+            np.save(os.path.join(cache_dir, f'{name}.npy'), array)
+
+        # meta is written last, a cache without it is never opened
+        meta = {'signature': signature, 'num_files': len(files), 'key_point_names': names,
+                'box_fields': list(BOX_FIELDS)}
+        tmp_file = os.path.join(cache_dir, _META_FILE + '.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_file, os.path.join(cache_dir, _META_FILE))
+        return DavidCache(cache_dir)
+
+    @staticmethod
+    def is_valid(files: list[str], cache_dir: str) -> bool:
+        """Checks if a compiled cache matches the annotation files
+        """
+        meta_file = os.path.join(cache_dir, _META_FILE)
+        if not os.path.exists(meta_file):
+            return False
+        if not all(os.path.exists(os.path.join(cache_dir, f'{name}.npy')) for name in _ARRAYS):
+            return False
+        with open(meta_file) as f:
+            meta = json.load(f)
+        return meta.get('num_files') == len(files) and meta.get('signature') == list(source_signature(files))
+
+    @staticmethod
+    def open(files: list[str], cache_dir: str, workers: int | None = None) -> "DavidCache":
+        """Open the compiled cache, rebuilding it when the json files changed
+        Args:
+            files (list[str]): sorted per-frame json files
+            cache_dir (str): cache directory
+            workers (int | None): compile workers if a rebuild is needed
+        Returns:
+            DavidCache: the opened cache
+        """
+        if DavidCache.is_valid(files, cache_dir):
+            return DavidCache(cache_dir)
+        return DavidCache.compile(files, cache_dir, workers)
+
+    @property
+    def num_frames(self) -> int:
+        """Number of frames
+        Returns:
+            int: frames' count
+        """
+        return len(self._frame_offsets) - 1
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir
+
+    @property
+    def signature(self) -> list[int]:
+        """Signature of the json files the cache was compiled from
+        Returns:
+            list[int]: [max mtime_ns, total size]
+        """
+        return self._meta['signature']
+
+    @property
+    def key_point_names(self) -> list[str]:
+        """Key point names, in column order of key_points
+        Returns:
+            list[str]: key point names
+        """
+        return self._key_point_names
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """Unpadded xywh boxes, (N, 3, 4) in visible/full/head order
+        """
+        return self._boxes
+
+    @property
+    def has_box(self) -> np.ndarray:
+        return self._has_box
+
+    @property
+    def key_points(self) -> np.ndarray:
+        """Key points, (N, K, 2), see key_point_mask for missing points
+        """
+        return self._key_points
+
+    @property
+    def key_point_mask(self) -> np.ndarray:
+        """Presence of each key point, (N, K)
+        """
+        return self._key_point_mask
+
+    @property
+    def frame_offsets(self) -> np.ndarray:
+        return self._frame_offsets
+
+    def __len__(self) -> int:
+        return self.num_frames
+
+    def rows(self, index: int) -> slice:
+        """Rows of a frame
+        Args:
+            index (int): frame index
+        Returns:
+            slice: row range in the arrays
+        """
+        return slice(int(self._frame_offsets[index]), int(self._frame_offsets[index + 1]))
+
+    def people(self, index: int, padding_size: tuple[int, int] = (0, 0)) -> FramePeople:
+        """People of a frame as array views, iterating yields the same Person objects as DavidDataset.aggregate
+        Args:
+            index (int): frame index
+            padding_size (tuple[int, int]): padding subtracted from present boxes
+        Returns:
+            FramePeople: people of the frame
+        """
+        rows = self.rows(index)
+        boxes = self._boxes[rows]
+        if padding_size[0] or padding_size[1]:
+            integral = all(isinstance(pad, (int, np.integer)) for pad in padding_size)
+            boxes = np.array(boxes, dtype=boxes.dtype if integral else np.float64)
+            has_box = self._has_box[rows]
+            boxes[:, :, 0] -= np.where(has_box, padding_size[0], 0)
+            boxes[:, :, 1] -= np.where(has_box, padding_size[1], 0)
+        return FramePeople(self._ids[rows], boxes, self._key_points[rows], self._key_point_names,
+                           self._key_point_mask[rows])
@@ -0,0 +1,232 @@
+from __future__ import annotations
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from inference.utils.sorting import get_sorted_alpanumeric_files, alphanumeric_key
+from inference.opencv.reader.image_reader import image_extensions
+from .david import load_frame
+from .data_class import Person
+
+
+def _stem_index(root: str, files: list[str]) -> dict[str, str]:
+    """Map path relative to root without extension to file
+    Raises:
+        Exception: raised when two files share a stem, e.g. a.jpg and a.png
+    """
+    index, duplicates = {}, []
+    for file in files:
+        stem = os.path.splitext(os.path.relpath(file, root))[0]
+        if stem in index:
+            duplicates.append((index[stem], file))
+        else:
+            index[stem] = file
+    if duplicates:
+        listed = ', '.join(f'{first} / {second}' for first, second in duplicates[:5])
+        raise Exception(f"{len(duplicates)} files share a stem with another file in {root}: {listed}")
+    return index
+
+
+def load_pair(image_file: str | None, annotation_file: str | None,
+              padding_size: tuple[int, int]) -> tuple[np.ndarray | None, list[Person]]:
+    """Decode one image and parse its annotation, runs on prefetch workers
+    """
+    frame = cv2.imread(image_file, cv2.IMREAD_COLOR) if image_file is not None else None
+    people = load_frame(annotation_file, padding_size) if annotation_file is not None else []
+    return frame, people
+
+
+class PairedSource:
+    """
+    Images and David annotations joined by file stem.
+    Files are matched in one indexed pass instead of zipping two listings, so a missing
+    image or annotation is reported and skipped instead of shifting every later pair.
+    Iteration yields (frame, people) with image decoding and json parsing prefetched together.
+    """
+    def __init__(self, image_dir: str, annotation_dir: str | None = None,
+                 padding_size: tuple[int, int] | list[int, int] | None = None,
+                 prefetch: int = 8, workers: int | None = None, keep_unmatched: bool = False,
+                 manifest_path: str | None = None):
+        """Initiate PairedSource object
+        Args:
+            image_dir (str): directory of frame images
+            annotation_dir (str | None): directory of per-frame json files, defaults to image_dir
+            padding_size (tuple[int, int] | None): padding subtracted from box coordinates
+            prefetch (int): pairs loaded ahead on the worker pool, 0 loads in the caller
+            workers (int | None): size of the worker pool
+            keep_unmatched (bool): also yield images without annotation, with no people
+            manifest_path (str | None): file used to persist the image listing between runs
+        """
+        self._init_props()
+        self._prefetch = prefetch
+        self._workers = workers
+        self._keep_unmatched = keep_unmatched
+        self._manifest_path = manifest_path
+        self._post_init(image_dir, image_dir if annotation_dir is None else annotation_dir, padding_size)
+
+    def _init_props(self):
+        self._name = None
+        self._pairs = []
+        self._missing_images = []
+        self._missing_annotations = []
+        self._padding_size = (0, 0)
+        self._info = None
+        self._frame_count = 0
+        self._prefetch = 8
+        self._workers = None
+        self._keep_unmatched = False
+        self._manifest_path = None
+        self._executor = None
+        self._pending = deque()
+        self._next_prefetch = 0
+
+    def _post_init(self, image_dir: str, annotation_dir: str,
+                   padding_size: tuple[int, int] | list[int, int] | None = None):
+        """Match images and annotations, update info property
+        """
+        self._name = os.path.basename(image_dir.rstrip('/'))
+        self._padding_size = (0, 0) if padding_size is None else padding_size
+
+        images = _stem_index(image_dir, get_sorted_alpanumeric_files(image_dir, image_extensions,
+                                                                       self._manifest_path))
+        annotations = _stem_index(annotation_dir, get_sorted_alpanumeric_files(annotation_dir, ['json']))
+
+        for stem in sorted(images.keys() | annotations.keys(), key=alphanumeric_key):
+            image, annotation = images.get(stem), annotations.get(stem)
+            if image is None:
+                self._missing_images.append(annotation)
+                continue
+            if annotation is None:
+                self._missing_annotations.append(image)
+                if not self._keep_unmatched:
+                    continue
+            self._pairs.append((stem, image, annotation))
+
+        self._info = {
+            "name": self._name,
+            "num_pairs": len(self._pairs),
+            "missing_images": len(self._missing_images),
+            "missing_annotations": len(self._missing_annotations),
+            "padding_size": self._padding_size,
+            "prefetch": self._prefetch,
+        }
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def info(self) -> dict:
+        return self._info
+
+    @property
+    def frame_count(self) -> int:
+        return self._frame_count
+
+    @property
+    def pairs(self) -> list[tuple[str, str, str | None]]:
+        """Matched files in frame order
+        Returns:
+            list[tuple[str, str, str | None]]: (stem, image file, annotation file)
+        """
+        return self._pairs
+
+    @property
+    def missing_images(self) -> list[str]:
+        """Annotation files without an image
+        Returns:
+            list[str]: unmatched annotation files
+        """
+        return self._missing_images
+
+    @property
+    def missing_annotations(self) -> list[str]:
+        """Image files without an annotation
+        Returns:
+            list[str]: unmatched image files
+        """
+        return self._missing_annotations
+
+    def load(self, index: int) -> tuple[np.ndarray | None, list[Person]]:
+        """Frame and people of one pair, without touching the iteration state
+        Args:
+            index (int): pair index
+        Returns:
+            tuple[np.ndarray | None, list[Person]]: decoded frame and its people
+        """
+        _, image, annotation = self._pairs[index]
+        return load_pair(image, annotation, self._padding_size)
+
+    def _start_prefetch(self):
+        self._stop_prefetch()
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='PairedSource')
+        self._next_prefetch = self._frame_count
+
+    def _stop_prefetch(self):
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _next_prefetched(self) -> tuple[np.ndarray | None, list[Person]]:
+        """Returns the next pair from the look-ahead window, in order
+        """
+        while len(self._pending) < self._prefetch and self._next_prefetch < len(self._pairs):
+            self._pending.append(self._executor.submit(self.load, self._next_prefetch))
+            self._next_prefetch += 1
+        return self._pending.popleft().result()
+
+    def release(self):
+        """Release Resources
+        """
+        self._stop_prefetch()
+
+    def __del__(self):
+        self._stop_prefetch()
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def __getitem__(self, index: int) -> tuple[np.ndarray | None, list[Person]]:
+        return self.load(index)
+
+    def __repr__(self):
+        return f'<PairedSource: {self.name}>'
+
+    def __str__(self):
+        return self.name
+
+    def __iter__(self):
+        self._frame_count = 0
+        if self._prefetch > 0:
+            self._start_prefetch()
+        return self
+
+    def __next__(self) -> tuple[np.ndarray | None, list[Person]]:
+        if self._frame_count >= len(self._pairs):
+            self._stop_prefetch()
+            raise StopIteration
+        pair = self._next_prefetched() if self._executor is not None else self.load(self._frame_count)
+        self._frame_count += 1
+        return pair
+
+    def __enter__(self) -> "PairedSource":
+        """Returns Conext for "with" block usage
+        Returns:
+            PairedSource: PairedSource object
+        """
+        return self
+
+    def __exit__(self, exc_type: None, exc_value: None, traceback: None) -> None:
+        """Release resources before exiting the "with" block
+        Args:
+            exc_type (NoneType): Exception type if any
+            exc_value (NoneType): Exception value if any
+            traceback (NoneType): Traceback of Exception
+        """
+        self.release()
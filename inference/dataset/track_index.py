@@ -0,0 +1,139 @@
+from __future__ import annotations
+import os
+import json
+
+import numpy as np
+
+from .david_cache import DavidCache
+from .data_class import BOX_NAMES
+
+_ARRAYS = ('track_ids', 'track_starts', 'track_rows', 'row_frames')
+_META_FILE = 'track_index.meta'
+
+
+class TrackIndex:
+    """
+    Inverted index from tracking id to its appearances in a DavidCache.
+    track_rows holds the cache rows of every track contiguously (in frame order),
+    track_starts[i]:track_starts[i + 1] is the range of track_ids[i].
+    Files live next to the cache and are rebuilt whenever the cache is recompiled.
+    """
+    def __init__(self, cache: DavidCache) -> None:
+        """Open a built index
+        Args:
+            cache (DavidCache): cache the index was built from
+        """
+        self._cache = cache
+        for name in _ARRAYS:
+            setattr(self, f'_{name}', np.load(os.path.join(cache.cache_dir, f'{name}.npy'), mmap_mode='r'))
+        self._lookup = {track_id: i for i, track_id in enumerate(self._track_ids.tolist())}
+
+    @staticmethod
+    def build(cache: DavidCache) -> "TrackIndex":
+        """Build the index of a cache in one vectorized pass
+        Args:
+            cache (DavidCache): compiled annotations
+        Returns:
+            TrackIndex: the opened index
+        """
+        offsets = np.asarray(cache.frame_offsets)
+        ids = np.asarray(cache.ids)
+        row_frames = np.repeat(np.arange(cache.num_frames, dtype=np.int64), np.diff(offsets))
+        # stable sort keeps each track's rows in frame order
+        track_rows = np.argsort(ids, kind='stable').astype(np.int64)
+        track_ids, track_starts = np.unique(ids[track_rows], return_index=True)
+        track_starts = np.append(track_starts, len(ids)).astype(np.int64)
+
+        arrays = {'track_ids': track_ids.astype(np.int64), 'track_starts': track_starts,
+                  'track_rows': track_rows, 'row_frames': row_frames}
+        for name, array in arrays.items():
+            np.save(os.path.join(cache.cache_dir, f'{name}.npy'), array)
+        with open(os.path.join(cache.cache_dir, _META_FILE), 'w') as f:
+            json.dump({'signature': cache.signature}, f)
+        return TrackIndex(cache)
+
+    @staticmethod
+    def open(cache: DavidCache) -> "TrackIndex":
+        """Open the index of a cache, building it when missing or stale
+        Args:
+            cache (DavidCache): compiled annotations
+        Returns:
+            TrackIndex: the opened index
+        """
+        meta_file = os.path.join(cache.cache_dir, _META_FILE)
+        if os.path.exists(meta_file):
+            with open(meta_file) as f:
+                meta = json.load(f)
+            if meta.get('signature') == cache.signature:
+                return TrackIndex(cache)
+        return TrackIndex.build(cache)
+
+    @property
+    def track_ids(self) -> np.ndarray:
+        """Every tracking id of the sequence
+        Returns:
+            np.ndarray: sorted unique ids
+        """
+        return self._track_ids
+
+    def __len__(self) -> int:
+        return len(self._track_ids)
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self._lookup
+
+    def rows(self, track_id: int) -> np.ndarray:
+        """Cache rows of one track
+        Args:
+            track_id (int): tracking id
+        Returns:
+            np.ndarray: rows in frame order, empty for unknown ids
+        """
+        i = self._lookup.get(track_id)
+        if i is None:
+            return np.empty(0, dtype=np.int64)
+        return self._track_rows[self._track_starts[i]:self._track_starts[i + 1]]
+
+    def positions(self, track_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """Every appearance of one track
+        Args:
+            track_id (int): tracking id
+        Returns:
+            tuple[np.ndarray, np.ndarray]: frame indexes and row within each frame
+        """
+        rows = self.rows(track_id)
+        frames = self._row_frames[rows]
+        return frames, rows - np.asarray(self._cache.frame_offsets)[frames]
+
+    def frames(self, track_id: int) -> np.ndarray:
+        """Frames one track appears in
+        """
+        return self._row_frames[self.rows(track_id)]
+
+    def trajectory(self, track_id: int, field: str = 'full',
+                   padding_size: tuple[int, int] = (0, 0)) -> tuple[np.ndarray, np.ndarray]:
+        """Boxes of one track across the sequence
+        Args:
+            track_id (int): tracking id
+            field (str): 'visible', 'full' or 'head'
+            padding_size (tuple[int, int]): padding subtracted from present boxes
+        Returns:
+            tuple[np.ndarray, np.ndarray]: frame indexes and (M, 4) xyxy boxes
+        """
+        rows = self.rows(track_id)
+        column = BOX_NAMES.index(field)
+        xyxy = np.array(self._cache.boxes[rows, column], dtype=np.float32)
+        has_box = self._cache.has_box[rows, column]
+        xyxy[:, 0] -= np.where(has_box, padding_size[0], 0)
+        xyxy[:, 1] -= np.where(has_box, padding_size[1], 0)
+        xyxy[:, 2:] += xyxy[:, :2]
+        return self._row_frames[rows], xyxy
+
+    def frame_ids(self, frame: int) -> set[int]:
+        """Tracking ids present in one frame
+        Args:
+            frame (int): frame index
+        Returns:
+            set[int]: ids of the frame
+        """
+        return set(self._cache.ids[self._cache.rows(frame)].tolist())
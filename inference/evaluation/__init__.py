@@ -0,0 +1,3 @@
+from .matching import box_iou, match_scores
+from .metrics import DetectionAccumulator, MOTAccumulator
+from .evaluate import evaluate_sequence, evaluate_sequences
@@ -0,0 +1,112 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from inference.dataset import DavidDataset, FramePeople
+from inference.results import ResultStore
+from .metrics import DetectionAccumulator, MOTAccumulator
+
+
+def _ground_truth(people: FramePeople | list, box: str) -> tuple[np.ndarray, np.ndarray]:
+    """Track ids and xyxy boxes of one annotated frame, people without the box are skipped
+    """
+    if not isinstance(people, FramePeople):
+        people = FramePeople.from_people(people)
+    xyxy = people.xyxy(box)
+    present = (xyxy[:, 2] > xyxy[:, 0]) & (xyxy[:, 3] > xyxy[:, 1])
+    return np.asarray(people.ids)[present], xyxy[present]
+
+
+def evaluate_sequence(annotation_dir: str,
+                      result_path: str,
+                      padding_size: tuple[int, int] | None = None,
+                      iou_threshold: float = 0.5,
+                      box: str = 'full',
+                      classes: list[int] | None = None,
+                      frame_offset: int = 0,
+                      block_size: int = 256,
+                      compiled: bool = False,
+                      cache_dir: str | None = None) -> tuple[DetectionAccumulator, MOTAccumulator]:
+    """Score one ResultStore against a David annotation directory.
+    Frames are streamed in blocks, so memory does not grow with the sequence length.
+    Args:
+        annotation_dir (str): directory of per-frame David json files
+        result_path (str): ResultStore directory written by Writer(result_format='store')
+        padding_size (tuple[int, int] | None): padding of the annotations, see DavidDataset
+        iou_threshold (float): minimum IoU of a match
+        box (str): ground truth box, 'visible', 'full' or 'head'
+        classes (list[int] | None): predicted classes kept, None keeps all
+        frame_offset (int): result frame of the first annotation frame
+        block_size (int): frames read from the store at once
+        compiled (bool): read annotations through the compiled DavidCache
+        cache_dir (str | None): directory of the compiled cache, see DavidDataset
+    Returns:
+        tuple[DetectionAccumulator, MOTAccumulator]: accumulators of the sequence
+    """
+    dataset = DavidDataset(annotation_dir, padding_size, compiled=compiled, cache_dir=cache_dir, cache_size=0)
+    detection = DetectionAccumulator(iou_threshold)
+    tracking = MOTAccumulator(iou_threshold)
+
+    try:
+        with ResultStore(result_path, mode='r') as store:
+            for start in range(0, len(dataset), block_size):
+                stop = min(start + block_size, len(dataset))
+                records = store.frames(start + frame_offset, stop + frame_offset)
+                if classes is not None:
+                    keep = np.isin(records['cls'], classes)
+                    records = {name: column[keep] for name, column in records.items()}
+                bounds = np.searchsorted(records['frame'], np.arange(start, stop + 1) + frame_offset)
+
+                for index, lo, hi in zip(range(start, stop), bounds[:-1].tolist(), bounds[1:].tolist()):
+                    gt_ids, gt_boxes = _ground_truth(dataset[index], box)
+                    pred_boxes = records['xyxy'][lo:hi]
+                    pred_ids = records['track_id'][lo:hi]
+                    detection.update(gt_boxes, pred_boxes, records['conf'][lo:hi])
+                    # rows without a track id are detections only
+                    tracked = pred_ids >= 0
+                    tracking.update(gt_ids, gt_boxes, pred_ids[tracked], pred_boxes[tracked])
+    finally:
+        dataset.release()
+    return detection, tracking
+
+
+def _evaluate_job(job: tuple[str, str, str, dict]) -> tuple[str, DetectionAccumulator, MOTAccumulator]:
+    name, annotation_dir, result_path, kwargs = job
+    detection, tracking = evaluate_sequence(annotation_dir, result_path, **kwargs)
+    return name, detection, tracking
+
+
+def evaluate_sequences(sequences: dict[str, tuple[str, str]],
+                       processes: int | None = None,
+                       **kwargs) -> dict[str, dict[str, dict[str, float]]]:
+    """Score many sequences in parallel on a process pool
+    Args:
+        sequences (dict[str, tuple[str, str]]): name to (annotation_dir, result_path)
+        processes (int | None): pool size, 0 evaluates in-process
+        **kwargs: passed to evaluate_sequence
+    Returns:
+        dict: per sequence and "overall" {"detection": {...}, "tracking": {...}} metrics
+    """
+    jobs = [(name, annotation_dir, result_path, kwargs)
+            for name, (annotation_dir, result_path) in sequences.items()]
+    if processes == 0:
+        results = map(_evaluate_job, jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=processes)
+        results = executor.map(_evaluate_job, jobs)
+
+    iou_threshold = kwargs.get('iou_threshold', 0.5)
+    overall_detection = DetectionAccumulator(iou_threshold)
+    overall_tracking = MOTAccumulator(iou_threshold)
+    metrics = {}
+    try:
+        for name, detection, tracking in results:
+            metrics[name] = {"detection": detection.compute(), "tracking": tracking.compute()}
+            overall_detection.merge(detection)
+            overall_tracking.merge(tracking)
+    finally:
+        if processes != 0:
+            executor.shutdown()
+    metrics["overall"] = {"detection": overall_detection.compute(), "tracking": overall_tracking.compute()}
+    return metrics
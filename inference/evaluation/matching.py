@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # optional, greedy matching is used without scipy
+    linear_sum_assignment = None
+
+
+def box_iou(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of two sets of boxes
+    Args:
+        boxes1 (np.ndarray): (N, 4) xyxy boxes
+        boxes2 (np.ndarray): (M, 4) xyxy boxes
+    Returns:
+        np.ndarray: (N, M) IoU matrix
+    """
+    boxes1 = np.asarray(boxes1, dtype=np.float32).reshape(-1, 4)
+    boxes2 = np.asarray(boxes2, dtype=np.float32).reshape(-1, 4)
+    area1 = (boxes1[:, 2] - boxes1[:, 0]).clip(0) * (boxes1[:, 3] - boxes1[:, 1]).clip(0)
+    area2 = (boxes2[:, 2] - boxes2[:, 0]).clip(0) * (boxes2[:, 3] - boxes2[:, 1]).clip(0)
+
+    top_left = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    bottom_right = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    wh = (bottom_right - top_left).clip(0)
+    inter = wh[..., 0] * wh[..., 1]
+    union = area1[:, None] + area2[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def _greedy_assignment(score: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Highest score first assignment, fallback of linear_sum_assignment
+    """
+    order = np.argsort(-score, axis=None, kind='stable')
+    rows, cols = np.unravel_index(order, score.shape)
+    used_rows = np.zeros(score.shape[0], dtype=bool)
+    used_cols = np.zeros(score.shape[1], dtype=bool)
+    matched_rows, matched_cols = [], []
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        if used_rows[row] or used_cols[col]:
+            continue
+        used_rows[row] = used_cols[col] = True
+        matched_rows.append(row)
+        matched_cols.append(col)
+    return np.array(matched_rows, dtype=np.int64), np.array(matched_cols, dtype=np.int64)
+
+
+def match_scores(score: np.ndarray, threshold: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    """One-to-one matching maximizing the total score, pairs below threshold are dropped.
+    Uses scipy's linear_sum_assignment when available, greedy matching otherwise
+    Args:
+        score (np.ndarray): (N, M) score matrix, e.g. IoU
+        threshold (float): minimum score of a kept pair
+    Returns:
+        tuple[np.ndarray, np.ndarray]: matched row and column indexes
+    """
+    score = np.asarray(score, dtype=np.float64)
+    if score.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    valid = score >= threshold
+    if linear_sum_assignment is not None:
+        # invalid pairs get zero weight so they never displace a valid one
+        rows, cols = linear_sum_assignment(np.where(valid, score, 0.0), maximize=True)
+    else:
+        rows, cols = _greedy_assignment(np.where(valid, score, -1.0))
+    keep = valid[rows, cols]
+    return rows[keep].astype(np.int64), cols[keep].astype(np.int64)
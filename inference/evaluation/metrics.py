@@ -0,0 +1,218 @@
+from __future__ import annotations
+from collections import Counter
+
+import numpy as np
+
+from .matching import box_iou, match_scores
+
+
+class DetectionAccumulator:
+    """
+    Streaming detection scorer, only per-prediction (score, true positive) pairs are kept.
+    Predictions are matched to ground truth greedily by descending score as in VOC/COCO.
+    """
+    def __init__(self, iou_threshold: float = 0.5) -> None:
+        self._iou_threshold = iou_threshold
+        self._scores = []
+        self._true_positives = []
+        self._num_gt = 0
+        self._num_frames = 0
+
+    @property
+    def num_gt(self) -> int:
+        return self._num_gt
+
+    @property
+    def num_frames(self) -> int:
+        return self._num_frames
+
+    def update(self, gt_boxes: np.ndarray, pred_boxes: np.ndarray, scores: np.ndarray) -> None:
+        """Score the predictions of one frame
+        Args:
+            gt_boxes (np.ndarray): (G, 4) xyxy ground truth boxes
+            pred_boxes (np.ndarray): (P, 4) xyxy predicted boxes
+            scores (np.ndarray): (P,) confidences
+        """
+        gt_boxes = np.asarray(gt_boxes, dtype=np.float32).reshape(-1, 4)
+        scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        self._num_gt += len(gt_boxes)
+        self._num_frames += 1
+        if len(scores) == 0:
+            return
+
+        order = np.argsort(-scores, kind='stable')
+        iou = box_iou(np.asarray(pred_boxes).reshape(-1, 4)[order], gt_boxes)
+        true_positive = np.zeros(len(order), dtype=bool)
+        if len(gt_boxes):
+            taken = np.zeros(len(gt_boxes), dtype=bool)
+            for i, row in enumerate(iou):
+                candidates = np.where(taken, -1.0, row)
+                j = int(candidates.argmax())
+                if candidates[j] >= self._iou_threshold:
+                    true_positive[i] = taken[j] = True
+        self._scores.append(scores[order])
+        self._true_positives.append(true_positive)
+
+    def merge(self, other: "DetectionAccumulator") -> None:
+        """Add the frames of another accumulator, e.g. from another sequence
+        """
+        self._scores.extend(other._scores)
+        self._true_positives.extend(other._true_positives)
+        self._num_gt += other._num_gt
+        self._num_frames += other._num_frames
+
+    def compute(self) -> dict[str, float]:
+        """Average precision (all-point interpolated), recall and precision
+        Returns:
+            dict[str, float]: ap, recall, precision, num_gt and num_pred
+        """
+        scores = np.concatenate(self._scores) if self._scores else np.zeros(0, dtype=np.float32)
+        true_positive = np.concatenate(self._true_positives) if self._true_positives else np.zeros(0, dtype=bool)
+        order = np.argsort(-scores, kind='stable')
+        tp = np.cumsum(true_positive[order])
+        fp = np.cumsum(~true_positive[order])
+
+        recall = tp / max(self._num_gt, 1)
+        precision = tp / np.maximum(tp + fp, 1)
+        # precision envelope, integrated over the recall steps
+        mrec = np.concatenate([[0.0], recall, [1.0]])
+        mpre = np.concatenate([[0.0], precision, [0.0]])
+        mpre = np.maximum.accumulate(mpre[::-1])[::-1]
+        steps = np.nonzero(mrec[1:] != mrec[:-1])[0]
+        ap = float(np.sum((mrec[steps + 1] - mrec[steps]) * mpre[steps + 1]))
+
+        return {
+            "ap": ap,
+            "recall": float(recall[-1]) if len(recall) else 0.0,
+            "precision": float(precision[-1]) if len(precision) else 0.0,
+            "num_gt": self._num_gt,
+            "num_pred": int(len(scores)),
+        }
+
+
+class MOTAccumulator:
+    """
+    Streaming CLEAR MOT (MOTA, MOTP, ID switches) and identity (IDF1) scorer.
+    Per frame, correspondences of the previous frame are kept while their IoU stays above
+    the threshold, the rest is matched by maximum IoU. IDF1 keeps only per (gt, pred) id pair
+    overlap counts, so memory grows with the number of tracks, not frames.
+    """
+    def __init__(self, iou_threshold: float = 0.5) -> None:
+        self._iou_threshold = iou_threshold
+        self._num_gt = 0
+        self._num_pred = 0
+        self._num_matches = 0
+        self._false_positives = 0
+        self._misses = 0
+        self._id_switches = 0
+        self._iou_sum = 0.0
+        self._num_frames = 0
+        self._last_match = {}
+        self._pair_counts = Counter()
+        self._closed_idtp = 0
+
+    @property
+    def num_frames(self) -> int:
+        return self._num_frames
+
+    def update(self, gt_ids: np.ndarray, gt_boxes: np.ndarray,
+               pred_ids: np.ndarray, pred_boxes: np.ndarray) -> None:
+        """Score the tracks of one frame
+        Args:
+            gt_ids (np.ndarray): (G,) ground truth track ids
+            gt_boxes (np.ndarray): (G, 4) xyxy ground truth boxes
+            pred_ids (np.ndarray): (P,) predicted track ids
+            pred_boxes (np.ndarray): (P, 4) xyxy predicted boxes
+        """
+        gt_ids = np.asarray(gt_ids, dtype=np.int64).reshape(-1).tolist()
+        pred_ids = np.asarray(pred_ids, dtype=np.int64).reshape(-1).tolist()
+        iou = box_iou(gt_boxes, pred_boxes)
+        overlap = iou >= self._iou_threshold
+        self._num_frames += 1
+        self._num_gt += len(gt_ids)
+        self._num_pred += len(pred_ids)
+
+        # keep last frame's correspondences that are still valid
+        gt_rows = {track_id: i for i, track_id in enumerate(gt_ids)}
+        pred_cols = {track_id: i for i, track_id in enumerate(pred_ids)}
+        matched_rows, matched_cols = [], []
+        used_rows, used_cols = set(), set()
+        for gt_id, pred_id in self._last_match.items():
+            row, col = gt_rows.get(gt_id), pred_cols.get(pred_id)
+            if row is None or col is None or row in used_rows or col in used_cols:
+                continue
+            if overlap[row, col]:
+                matched_rows.append(row)
+                matched_cols.append(col)
+                used_rows.add(row)
+                used_cols.add(col)
+
+        free_rows = np.setdiff1d(np.arange(len(gt_ids)), matched_rows)
+        free_cols = np.setdiff1d(np.arange(len(pred_ids)), matched_cols)
+        rows, cols = match_scores(iou[np.ix_(free_rows, free_cols)], self._iou_threshold)
+        for row, col in zip(free_rows[rows].tolist(), free_cols[cols].tolist()):
+            last = self._last_match.get(gt_ids[row])
+            if last is not None and last != pred_ids[col]:
+                self._id_switches += 1
+            matched_rows.append(row)
+            matched_cols.append(col)
+
+        for row, col in zip(matched_rows, matched_cols):
+            self._last_match[gt_ids[row]] = pred_ids[col]
+        self._num_matches += len(matched_rows)
+        self._misses += len(gt_ids) - len(matched_rows)
+        self._false_positives += len(pred_ids) - len(matched_cols)
+        self._iou_sum += float(iou[matched_rows, matched_cols].sum()) if matched_rows else 0.0
+
+        rows, cols = np.nonzero(overlap)
+        self._pair_counts.update(zip((gt_ids[row] for row in rows.tolist()),
+                                     (pred_ids[col] for col in cols.tolist())))
+
+    def idtp(self) -> int:
+        """Identity true positives, from the best one-to-one gt/pred track assignment
+        Returns:
+            int: IDTP summed over every merged sequence
+        """
+        if not self._pair_counts:
+            return self._closed_idtp
+        gt_index = {track_id: i for i, track_id in enumerate({gt for gt, _ in self._pair_counts})}
+        pred_index = {track_id: i for i, track_id in enumerate({pred for _, pred in self._pair_counts})}
+        counts = np.zeros((len(gt_index), len(pred_index)), dtype=np.float64)
+        for (gt, pred), count in self._pair_counts.items():
+            counts[gt_index[gt], pred_index[pred]] = count
+        rows, cols = match_scores(counts, 1)
+        return self._closed_idtp + int(counts[rows, cols].sum())
+
+    def merge(self, other: "MOTAccumulator") -> None:
+        """Add another sequence, its ids are never matched against this one's
+        """
+        self._num_gt += other._num_gt
+        self._num_pred += other._num_pred
+        self._num_matches += other._num_matches
+        self._false_positives += other._false_positives
+        self._misses += other._misses
+        self._id_switches += other._id_switches
+        self._iou_sum += other._iou_sum
+        self._num_frames += other._num_frames
+        self._closed_idtp += other.idtp()
+
+    def compute(self) -> dict[str, float]:
+        """CLEAR MOT and identity metrics
+        Returns:
+            dict[str, float]: mota, motp, idf1, idp, idr, id_switches, false_positives, misses,
+                num_gt, num_pred and num_matches
+        """
+        idtp = self.idtp()
+        return {
+            "mota": 1.0 - (self._misses + self._false_positives + self._id_switches) / max(self._num_gt, 1),
+            "motp": self._iou_sum / max(self._num_matches, 1),
+            "idf1": 2 * idtp / max(self._num_gt + self._num_pred, 1),
+            "idp": idtp / max(self._num_pred, 1),
+            "idr": idtp / max(self._num_gt, 1),
+            "id_switches": self._id_switches,
+            "false_positives": self._false_positives,
+            "misses": self._misses,
+            "num_gt": self._num_gt,
+            "num_pred": self._num_pred,
+            "num_matches": self._num_matches,
+        }
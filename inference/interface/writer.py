@@ -121,10 +121,19 @@ class WriterInterface(metaclass=ABCMeta):
         """
         ...
     
-    def save_json(self, output: list[dict]) -> None:
+    def save_json(self, output: list[dict], frame_index: int | None = None) -> None:
         """Save output to json file
         Args:
             output (list[dict]): output to save
+            frame_index (int | None): frame the output belongs to
+        """
+        ...
+
+    def save_results(self, output: np.ndarray, frame_index: int | None = None) -> None:
+        """Save output to binary results file
+        Args:
+            output (np.ndarray): rows of [x0, y0, x1, y1, conf, cls(, track_id)]
+            frame_index (int | None): frame the output belongs to
         """
         ...
 
@@ -1,2 +1,2 @@
-from .reader import VideoReader, ImageReader, WEBCAM
-from .writer import Writer
\ No newline at end of file
+from .reader import VideoReader, ImageReader, S3ImageReader, WEBCAM
+from .writer import Writer, AsyncWriter, SegmentedWriter
@@ -1,2 +1,3 @@
 from .video_reader import VideoReader, WEBCAM
-from .image_reader import ImageReader
\ No newline at end of file
+from .image_reader import ImageReader
+from .s3_reader import S3ImageReader
@@ -0,0 +1,140 @@
+from __future__ import annotations
+import asyncio
+import threading
+import weakref
+
+import numpy as np
+
+_END_OF_STREAM = object()
+
+
+def _async_decode(reader_ref: weakref.ref, loop: asyncio.AbstractEventLoop, frames: asyncio.Queue,
+                  slots: threading.Semaphore, stop: threading.Event) -> None:
+    """Decode thread body, the reader is only referenced while a frame is read
+    so an abandoned reader can be collected and the thread ends with it
+    """
+    def hand_off(item) -> bool:
+        try:
+            loop.call_soon_threadsafe(frames.put_nowait, item)
+            return True
+        except RuntimeError:
+            # event loop already closed
+            return False
+
+    while not stop.is_set() and reader_ref() is not None:
+        if not slots.acquire(timeout=0.1):
+            continue
+        reader = reader_ref()
+        if stop.is_set() or reader is None:
+            break
+        try:
+            frame = next(reader)
+        except StopIteration:
+            hand_off(_END_OF_STREAM)
+            return
+        except Exception as e:
+            hand_off(e)
+            return
+        finally:
+            del reader
+        if frame is None:
+            hand_off(_END_OF_STREAM)
+            return
+        if not hand_off(frame):
+            return
+
+
+class AsyncReaderMixin:
+    """
+    asyncio support for readers.
+    A dedicated decode thread iterates the reader and hands frames to the event loop,
+    at most async_queue_size frames are decoded ahead of the consumer.
+    Readers stop the thread from release and __del__ through _signal_async_stop.
+    """
+    _async_queue_size = 4
+
+    def _start_async(self) -> None:
+        """Start the decode thread for the running event loop
+        """
+        # readers return themselves from __iter__, which also rewinds them
+        reader = iter(self)
+        self._async_queue = asyncio.Queue()
+        self._async_slots = threading.Semaphore(self._async_queue_size)
+        self._async_stop = threading.Event()
+        self._async_exhausted = False
+        self._async_thread = threading.Thread(target=_async_decode,
+                                              args=(weakref.ref(reader), asyncio.get_running_loop(),
+                                                    self._async_queue, self._async_slots, self._async_stop),
+                                              name=f'{type(self).__name__}-decode', daemon=True)
+        self._async_thread.start()
+
+    def _signal_async_stop(self) -> None:
+        """Ask the decode thread to stop without waiting for it
+        """
+        stop = getattr(self, '_async_stop', None)
+        if stop is not None:
+            stop.set()
+
+    def _stop_async(self) -> None:
+        """Stop the decode thread, frames it already decoded are dropped. Blocks until the
+        thread ended, call it off the event loop
+        """
+        thread = getattr(self, '_async_thread', None)
+        if thread is None:
+            return
+        self._async_stop.set()
+        thread.join()
+        self._async_thread = None
+
+    def __aiter__(self) -> "AsyncReaderMixin":
+        """Returns async iterable object for reading frames
+        Returns:
+            AsyncReaderMixin: async iterable object for reading frames
+        """
+        # a previous decode thread is only signalled here, __anext__ joins it off the loop
+        self._signal_async_stop()
+        self._async_restart = True
+        return self
+
+    async def __anext__(self) -> np.ndarray:
+        """Returns next frame from the decode thread
+        Raises:
+            StopAsyncIteration: No more frames to read
+        Returns:
+            np.ndarray: frame read from source
+        """
+        if getattr(self, '_async_restart', False):
+            self._async_restart = False
+            await asyncio.get_running_loop().run_in_executor(None, self._stop_async)
+            self._start_async()
+
+        # the decode thread hands off nothing after the end of stream or an error
+        if getattr(self, '_async_thread', None) is None or self._async_exhausted:
+            raise StopAsyncIteration
+        item = await self._async_queue.get()
+        self._async_slots.release()
+        if item is _END_OF_STREAM:
+            self._async_exhausted = True
+            raise StopAsyncIteration
+        if isinstance(item, Exception):
+            self._async_exhausted = True
+            raise item
+        return item
+
+    async def __aenter__(self) -> "AsyncReaderMixin":
+        """Returns Conext for "async with" block usage
+        Returns:
+            AsyncReaderMixin: Reader object
+        """
+        return self
+
+    async def __aexit__(self, exc_type: None, exc_value: None,
+                        traceback: None) -> None:
+        """Stop the decode thread and release resources before exiting the "async with" block
+        Args:
+            exc_type (NoneType): Exception type if any
+            exc_value (NoneType): Exception value if any
+            traceback (NoneType): Traceback of Exception
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self._stop_async)
+        self.release()
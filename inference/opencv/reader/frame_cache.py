@@ -0,0 +1,147 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+
+import cv2
+import numpy as np
+
+from inference.utils import source_signature
+
+
+class FrameCache:
+    """
+    On-disk cache of decoded frames.
+    Frames are appended to one raw file while the source is decoded the first time,
+    later runs memory-map it (copy-on-write) and return zero-copy views.
+    The cache is rebuilt when the source mtime or size changes.
+    """
+    def __init__(self,
+                 name: str,
+                 files: list[str],
+                 cache_dir: str,
+                 scale: float = 1.0,
+                 variant: str = '') -> None:
+        """Initiate FrameCache object
+        Args:
+            name (str): path of the source, used as cache key
+            files (list[str]): files whose mtime/size invalidate the cache
+            cache_dir (str): directory holding cache files
+            scale (float): downscale factor applied to frames before caching
+            variant (str): any other decode option that changes the cached frames
+        """
+        self._scale = scale
+        key = hashlib.sha1(f'{os.path.abspath(name)}:{scale}:{variant}'.encode()).hexdigest()[:16]
+        base = os.path.join(cache_dir, f'{os.path.basename(name)}.{key}')
+        self._data_file = base + '.frames'
+        self._index_file = base + '.index.npy'
+        self._meta_file = base + '.json'
+        self._signature = list(source_signature(files))
+
+        self._mmap = None
+        self._index = None
+        self._writer = None
+        self._offsets = []
+        self._offset = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        if self._is_valid():
+            self._mmap = np.memmap(self._data_file, dtype=np.uint8, mode='c')
+            self._index = np.load(self._index_file)
+
+    def _is_valid(self) -> bool:
+        """Checks if a complete cache for the current source exists
+        """
+        if not (os.path.exists(self._meta_file) and os.path.exists(self._data_file)
+                and os.path.exists(self._index_file)):
+            return False
+        with open(self._meta_file) as f:
+            meta = json.load(f)
+        return meta.get('signature') == self._signature and meta.get('scale') == self._scale
+
+    @property
+    def is_complete(self) -> bool:
+        """Checks if frames can be served from the cache
+        Returns:
+            bool: True if the cache is complete and valid
+        """
+        return self._mmap is not None
+
+    @property
+    def scale(self) -> float:
+        """Downscale factor of cached frames
+        Returns:
+            float: scale applied to frames
+        """
+        return self._scale
+
+    def __len__(self) -> int:
+        """Number of cached frames
+        """
+        if self._index is not None:
+            return len(self._index)
+        return len(self._offsets)
+
+    def get(self, index: int) -> np.ndarray | None:
+        """Returns a cached frame
+        Args:
+            index (int): frame index
+        Returns:
+            np.ndarray | None: zero-copy view on the frame, None past the end
+        """
+        if self._mmap is None or index >= len(self._index):
+            return None
+        offset, height, width, channel = self._index[index]
+        size = height * width * channel
+        return self._mmap[offset:offset + size].reshape(height, width, channel)
+
+    def resize(self, frame: np.ndarray) -> np.ndarray:
+        """Apply the cache downscale to a decoded frame
+        """
+        if self._scale == 1.0:
+            return frame
+        height, width = frame.shape[:2]
+        size = (max(1, int(round(width * self._scale))), max(1, int(round(height * self._scale))))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def append(self, index: int, frame: np.ndarray) -> None:
+        """Store a decoded frame, frames must arrive in order
+        Args:
+            index (int): frame index, out of order frames (e.g. after a rewind) are ignored
+            frame (np.ndarray): frame already passed through resize()
+        """
+        if self._mmap is not None or index != len(self._offsets):
+            return
+        if self._writer is None:
+            self._writer = open(self._data_file + '.tmp', 'wb')
+        frame = np.ascontiguousarray(frame)
+        if frame.ndim == 2:
+            frame = frame[:, :, None]
+        self._writer.write(frame.data)
+        self._offsets.append((self._offset, *frame.shape))
+        self._offset += frame.nbytes
+
+    def finalize(self) -> None:
+        """Publish the cache once the whole source was decoded
+        """
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        os.replace(self._data_file + '.tmp', self._data_file)
+        np.save(self._index_file, np.asarray(self._offsets, dtype=np.int64).reshape(-1, 4))
+        with open(self._meta_file, 'w') as f:
+            json.dump({'signature': self._signature, 'scale': self._scale,
+                       'num_frames': len(self._offsets)}, f)
+
+        self._mmap = np.memmap(self._data_file, dtype=np.uint8, mode='c')
+        self._index = np.load(self._index_file)
+
+    def release(self) -> None:
+        """Release Resources, an unfinished cache is discarded
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            os.remove(self._data_file + '.tmp')
+        self._mmap = None
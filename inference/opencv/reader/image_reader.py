@@ -6,10 +6,18 @@ import cv2
 import numpy as np
 
 from inference.interface.reader import ReaderInterface
-from inference.utils import get_sorted_alpanumeric_files
+from inference.utils import get_sorted_alpanumeric_files, iter_sorted_alphanumeric_files
+from .frame_cache import FrameCache
+from .async_reader import AsyncReaderMixin
 
 image_extensions = set(['jpg', 'jpeg', 'png', 'bmp', 'tiff', 'tif'])
-class ImageReader(ReaderInterface):
+reduced_decode_flags = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+class ImageReader(AsyncReaderMixin, ReaderInterface):
     """
     Video Reading wrapper around Opencv-Backend
     """
@@ -20,6 +28,12 @@ class ImageReader(ReaderInterface):
                  width: int | None = None,
                  height: int | None = None,
                  fps: int = 30,
+                 cache_dir: str | None = None,
+                 cache_scale: float = 1.0,
+                 manifest_path: str | None = None,
+                 target_size: int | tuple[int, int] | None = None,
+                 async_queue_size: int = 4,
+                 lazy: bool = False,
                  **kwargs) -> None:
         """Initiate Reader object
         Args:
@@ -30,10 +44,26 @@ class ImageReader(ReaderInterface):
             less than batch_size frames (depending on how many frames were left for last batch).
             If set to False, last batch may have some frames made up of zeros to match batch_size.
             Defaults to False.
+            cache_dir (str | None): if set, decoded frames are cached there and memory-mapped
+            on later runs over the same source. Defaults to None.
+            cache_scale (float): downscale factor applied to frames stored in the cache.
+            manifest_path (str | None): file used to persist the directory listing between runs.
+            target_size (int | tuple[int, int] | None): model input size as int or (width, height).
+            If set, images are decoded at the largest 1/2, 1/4 or 1/8 reduction that still covers
+            the letterboxed input, see decode_scale for mapping boxes back. Defaults to None.
+            async_queue_size (int): frames decoded ahead when iterated with "async for".
+            lazy (bool): if set, the directory tree is listed while frames are read, one directory
+            at a time, so reading starts before a large tree is fully listed. Files must not share a
+            name prefix with sibling directories, e.g. frames under per-sequence directories, and
+            num_files is None until the listing ended. Not combinable with cache_dir or manifest_path.
+            Defaults to False.
         """
         # initiate props
         self._init_props()
 
+        # set async decode look-ahead
+        self._async_queue_size = async_queue_size
+
         # set batch
         self._batch_size = batch_size
         self._dynamic_batch = dynamic_batch
@@ -42,6 +72,21 @@ class ImageReader(ReaderInterface):
         self._width = width
         self._height = height
 
+        # set decoded frame cache
+        self._cache_dir = cache_dir
+        self._cache_scale = cache_scale
+
+        # set directory listing manifest
+        self._manifest_path = manifest_path
+        self._lazy = lazy
+        if lazy and (cache_dir is not None or manifest_path is not None):
+            raise Exception("lazy listing can not be combined with cache_dir or manifest_path.")
+
+        # set reduced decode
+        if isinstance(target_size, int):
+            target_size = (target_size, target_size)
+        self._target_size = target_size
+
         # update info with current video stream
         self._post_init(path)
 
@@ -60,8 +105,19 @@ class ImageReader(ReaderInterface):
         self._minutes = 0
         self._num_files = 0
         self._img_files = []
+        self._lazy = False
+        self._file_iter = None
         self._batch_size = None
         self._dynamic_batch = False
+        self._cache_dir = None
+        self._cache_scale = 1.0
+        self._cache = None
+        self._manifest_path = None
+        self._target_size = None
+        self._source_size = None
+        self._decode_factor = 1
+        self._decode_flag = cv2.IMREAD_COLOR
+        self._decode_scale = (1.0, 1.0)
         self._prev_process_time = time.time()
 
     def _post_init(self, path: str) -> None:
@@ -76,10 +132,26 @@ class ImageReader(ReaderInterface):
             self._name = self._name[:-4]
         
         # get image files
-        self._img_files = get_sorted_alpanumeric_files(path, image_extensions)
-        self._num_files = len(self._img_files)
+        if self._lazy:
+            self._file_iter = iter_sorted_alphanumeric_files(path, image_extensions)
+            self._num_files = None
+        else:
+            self._img_files = get_sorted_alpanumeric_files(path, image_extensions, self._manifest_path)
+            self._num_files = len(self._img_files)
         self._inference_time = 1 / self._fps * 1000
-        
+
+        if self._target_size is not None:
+            self._select_decode()
+
+        if self._cache_dir is not None:
+            self._cache = FrameCache(path, self._img_files, self._cache_dir, self._cache_scale,
+                                     variant=f'reduced{self._decode_factor}')
+            # frames come out of the cache downscaled, report the size they are returned at
+            if self._width is not None:
+                self._width = int(round(self._width * self._cache_scale))
+            if self._height is not None:
+                self._height = int(round(self._height * self._cache_scale))
+
         # update info
         self._info = {
             "name": self._name,
@@ -87,8 +159,34 @@ class ImageReader(ReaderInterface):
             "height": self._height,
             "frame": self._frame_count,
             "num_files": self._num_files,
+            "cached": self._cache is not None and self._cache.is_complete,
+            "decode_factor": self._decode_factor,
+            "decode_scale": self._decode_scale,
         }
 
+    def _select_decode(self) -> None:
+        """Pick the largest reduced decode factor that still covers the model input
+        The first image is probed once, the rest of the source is assumed to share its size.
+        """
+        first_file = self._file(0)
+        if first_file is None:
+            return
+        probe = cv2.imread(first_file, cv2.IMREAD_COLOR)
+        if probe is None:
+            return
+        height, width = probe.shape[:2]
+        self._source_size = (width, height)
+
+        # letterboxed content is width * r by height * r, so any factor up to 1 / r is enough
+        target_w, target_h = self._target_size
+        max_factor = max(width / target_w, height / target_h)
+        for factor, flag in reduced_decode_flags:
+            if factor <= max_factor:
+                self._decode_factor = factor
+                self._decode_flag = flag
+                self._decode_scale = (1 / factor, 1 / factor)
+                break
+
     @property
     def name(self) -> str:
         """Name of Video Source
@@ -121,6 +219,14 @@ class ImageReader(ReaderInterface):
         """
         return self._fps
 
+    @property
+    def decode_scale(self) -> tuple[float, float]:
+        """Scale of decoded frames relative to the image files
+        Returns:
+            tuple[float, float]: x and y scale, divide box coordinates by it to map back
+        """
+        return self._decode_scale
+
     @property
     def info(self) -> dict:
         """Video information
@@ -166,11 +272,48 @@ class ImageReader(ReaderInterface):
             Union[np.ndarry, None]: next frame if available, None otherwise.
         """
 
-        frame = cv2.imread(self._img_files[self._frame_count])
+        if self._cache is not None and self._cache.is_complete:
+            frame = self._cache.get(self._frame_count)
+        else:
+            file_name = self._file(self._frame_count)
+            frame = None if file_name is None else cv2.imread(file_name, self._decode_flag)
+            if frame is not None and self._cache is not None:
+                frame = self._cache.resize(frame)
+                self._cache.append(self._frame_count, frame)
+
+        if frame is not None and self._source_size is not None and self._frame_count == 0:
+            self._update_decode_scale(frame)
+
         self._frame_count += 0 if frame is None else 1
         self._is_open = frame is not None
+
+        if self._cache is not None and self._frame_count == self._num_files:
+            self._cache.finalize()
         return frame
 
+    def _file(self, index: int) -> str | None:
+        """Path of an image, the lazy listing is advanced as far as needed
+        Returns:
+            str | None: image path, None past the last image
+        """
+        while index >= len(self._img_files) and self._file_iter is not None:
+            file_name = next(self._file_iter, None)
+            if file_name is None:
+                self._file_iter = None
+                self._num_files = len(self._img_files)
+                if self._info is not None:
+                    self._info["num_files"] = self._num_files
+            else:
+                self._img_files.append(file_name)
+        return self._img_files[index] if index < len(self._img_files) else None
+
+    def _update_decode_scale(self, frame: np.ndarray) -> None:
+        """Use the exact size of the first returned frame, decoders round reduced sizes differently
+        """
+        width, height = self._source_size
+        self._decode_scale = (frame.shape[1] / width, frame.shape[0] / height)
+        self._info["decode_scale"] = self._decode_scale
+
     def read_batch(self) -> np.ndarray | None:
         """Returns next batch of frames from the video if available
         Returns:
@@ -210,21 +353,34 @@ class ImageReader(ReaderInterface):
     def release(self) -> None:
         """Release Resources
         """
+        self._signal_async_stop()
         if self._is_open is True:
+            # a lazy listing stops at the files listed so far
+            if self._file_iter is not None:
+                self._file_iter = None
+                self._num_files = len(self._img_files)
+                self._info["num_files"] = self._num_files
             self._frame_count = self._num_files
     
-    def show(self, frame: np.ndarray | None) -> None:
+    def show(self, frame: np.ndarray | None) -> bool:
         """Show video
+        Returns:
+            bool: False once 'q' was pressed and the window closed, True otherwise.
         """
         cv2.imshow(self._name, frame)
         if cv2.waitKey(1) & 0xFF == ord('q'):
             self.release()
             cv2.destroyAllWindows()
             print("Exiting...")
+            return False
+        return True
 
     def __del__(self) -> None:
         """Release Resources
         """
+        self._signal_async_stop()
+        if self._cache is not None:
+            self._cache.release()
 
     def __next__(self) -> np.ndarray:
         """Returns next frame from the video
@@ -233,7 +389,7 @@ class ImageReader(ReaderInterface):
         Returns:
             np.ndarray: frame read from video
         """
-        if self._frame_count == self._num_files:
+        if self._file(self._frame_count) is None:
             raise StopIteration
         frame = self.read()
 
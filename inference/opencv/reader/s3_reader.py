@@ -0,0 +1,377 @@
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+
+import cv2
+import numpy as np
+
+from inference.interface.reader import ReaderInterface
+from inference.utils import sorted_alphanumeric
+from .image_reader import image_extensions
+from .async_reader import AsyncReaderMixin
+
+
+def split_s3_url(url: str) -> tuple[str, str]:
+    """Split s3://bucket/prefix into bucket and prefix
+    """
+    if url.startswith('s3://'):
+        url = url[len('s3://'):]
+    bucket, _, prefix = url.partition('/')
+    return bucket, prefix
+
+
+class S3ImageReader(AsyncReaderMixin, ReaderInterface):
+    """
+    Image Reading wrapper for S3-compatible buckets.
+    Keys are listed once in the same natural order as ImageReader, images are fetched by
+    a thread pool sharing one pooled client and decoded from memory.
+    """
+    def __init__(self,
+                 path: str,
+                 batch_size: int | None = None,
+                 dynamic_batch: bool = False,
+                 width: int | None = None,
+                 height: int | None = None,
+                 fps: int = 30,
+                 workers: int = 8,
+                 endpoint_url: str | None = None,
+                 client=None,
+                 async_queue_size: int = 4,
+                 **kwargs) -> None:
+        """Initiate Reader object
+        Args:
+            path (str): s3://bucket/prefix of the images
+            batch_size (int | None): number of frames to return (as one batch) for one read.
+            Defaults to None will return images individually without batch axis.
+            dynamic_batch (bool): if set to True then last batch of frames may have
+            less than batch_size frames (depending on how many frames were left for last batch).
+            If set to False, last batch may have some frames made up of zeros to match batch_size.
+            Defaults to False.
+            workers (int): number of concurrent in-flight GET requests.
+            endpoint_url (str | None): endpoint of an S3-compatible server, None for AWS.
+            client (botocore client | None): client to use instead of creating one, its connection
+            pool should allow `workers` connections.
+            async_queue_size (int): frames decoded ahead when iterated with "async for".
+            kwargs: passed to boto3 client creation (region_name, aws_access_key_id, ...).
+        """
+        # initiate props
+        self._init_props()
+
+        # set async decode look-ahead
+        self._async_queue_size = async_queue_size
+
+        # set batch
+        self._batch_size = batch_size
+        self._dynamic_batch = dynamic_batch
+
+        # set image size
+        self._width = width
+        self._height = height
+        self._fps = fps
+
+        # set fetch pool
+        self._workers = max(1, workers)
+        self._client = client if client is not None else self._create_client(endpoint_url, **kwargs)
+        self._executor = None
+        self._ensure_executor()
+
+        # update info with bucket listing
+        self._post_init(path)
+
+    def _init_props(self) -> None:
+        """Init all class properties to default values
+        """
+        self._name = None
+        self._bucket = None
+        self._prefix = None
+        self._width = None
+        self._height = None
+        self._is_open = None
+        self._info = None
+        self._fps = 30
+        self._frame_count = 0
+        self._num_files = 0
+        self._keys = []
+        self._batch_size = None
+        self._dynamic_batch = False
+        self._workers = 1
+        self._client = None
+        self._executor = None
+        self._pending = deque()
+        self._next_fetch = 0
+
+    def _create_client(self, endpoint_url: str | None, **kwargs):
+        """Create a client whose connection pool fits every worker
+        """
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError as e:
+            raise ImportError("S3ImageReader requires boto3, install it with `pip install boto3`.") from e
+
+        config = Config(max_pool_connections=self._workers)
+        return boto3.session.Session().client('s3', endpoint_url=endpoint_url, config=config, **kwargs)
+
+    def _post_init(self, path: str) -> None:
+        """Update info property
+        """
+        self._bucket, self._prefix = split_s3_url(path)
+        self._name = self._prefix.rstrip('/').split('/')[-1] or self._bucket
+
+        # list keys page by page
+        keys = []
+        paginator = self._client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self._bucket, Prefix=self._prefix):
+            for obj in page.get('Contents', []):
+                key = obj['Key']
+                if key.rpartition('.')[2] in image_extensions:
+                    keys.append(key)
+        self._keys = sorted_alphanumeric(keys)
+        self._num_files = len(self._keys)
+
+        # update info
+        self._info = {
+            "name": self._name,
+            "bucket": self._bucket,
+            "prefix": self._prefix,
+            "width": self._width,
+            "height": self._height,
+            "frame": self._frame_count,
+            "num_files": self._num_files,
+            "workers": self._workers,
+        }
+
+    @property
+    def name(self) -> str:
+        """Name of Image Source
+        Returns:
+            str: last part of the prefix
+        """
+        return self._name
+
+    @property
+    def width(self) -> int:
+        """Width of Image
+        Returns:
+            int: width of image frame
+        """
+        return self._width
+
+    @property
+    def height(self) -> int:
+        """Height of Image
+        Returns:
+            int: height of image frame
+        """
+        return self._height
+
+    @property
+    def fps(self) -> float:
+        """FPS of Image Source
+        Returns:
+            float: fps of image
+        """
+        return self._fps
+
+    @property
+    def info(self) -> dict:
+        """Image source information
+        Returns:
+            dict: info of bucket, prefix, width, height and files.
+        """
+        return self._info
+
+    @property
+    def keys(self) -> list[str]:
+        """Sorted image keys
+        Returns:
+            list[str]: keys read by this reader
+        """
+        return self._keys
+
+    @property
+    def frame_count(self) -> int:
+        """Total frames read
+        Returns:
+            int: read frames' count
+        """
+        return self._frame_count
+
+    @property
+    def seconds(self) -> float:
+        """Total seconds read
+        Returns:
+            float: read frames' in seconds
+        """
+        return (self._frame_count / self._fps) if self._fps else 0
+
+    @property
+    def minutes(self) -> float:
+        """Total minutes read
+        Returns:
+            float: read frames' in minutes
+        """
+        return self.seconds / 60.0
+
+    def is_open(self) -> bool:
+        """Checks if last read frame was valid
+        Returns:
+            bool: True if last frame was not None, false otherwise.
+        """
+        return self._is_open
+
+    def _fetch(self, key: str) -> np.ndarray | None:
+        """Download and decode one image without touching the disk
+        """
+        body = self._client.get_object(Bucket=self._bucket, Key=key)['Body'].read()
+        return cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def _ensure_executor(self) -> None:
+        """Create the download pool, again after release when the reader is re-iterated
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='S3ImageReader')
+
+    def _fill_pending(self) -> None:
+        """Keep `workers` GET requests in flight
+        """
+        self._ensure_executor()
+        while len(self._pending) < self._workers and self._next_fetch < self._num_files:
+            key = self._keys[self._next_fetch]
+            self._pending.append(self._executor.submit(self._fetch, key))
+            self._next_fetch += 1
+
+    def _reset_pending(self) -> None:
+        """Drop prefetched frames and restart fetching at the current frame
+        """
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._next_fetch = self._frame_count
+
+    def read_frame(self) -> np.ndarray | None:
+        """Returns next frame from the bucket if available
+        Returns:
+            Union[np.ndarry, None]: next frame if available, None otherwise.
+        """
+        if self._frame_count >= self._num_files:
+            self._is_open = False
+            return None
+
+        self._fill_pending()
+        future: Future = self._pending.popleft()
+        frame = future.result()
+        self._fill_pending()
+
+        self._frame_count += 0 if frame is None else 1
+        self._is_open = frame is not None
+        return frame
+
+    def read_batch(self) -> np.ndarray | None:
+        """Returns next batch of frames from the bucket if available
+        Returns:
+            np.ndarry | None: next batch if available, None otherwise.
+        """
+        if self._is_open is False:
+            return None
+
+        # pre-allocate batch
+        batch = np.zeros((self._batch_size, self.height, self.width, 3), dtype="uint8")
+
+        # fill batch
+        for i in range(self._batch_size):
+            # read frame
+            frame = self.read_frame()
+
+            # stop process, no frames left
+            if frame is None:
+                # decrm index because this frame was empty
+                i -= 1
+                break
+
+            # add to batch
+            batch[i] = frame
+
+        return batch[:i + 1] if self._dynamic_batch else batch
+
+    def read(self) -> np.ndarray | None:
+        """Returns next frame or batch of frames from the bucket if available
+        Returns:
+            np.ndarry | None: next frame or batch of frames if available, None otherwise.
+        """
+        if self._batch_size is None:
+            return self.read_frame()
+        return self.read_batch()
+
+    def release(self) -> None:
+        """Release Resources
+        """
+        self._signal_async_stop()
+        self._reset_pending()
+        self._frame_count = self._num_files
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def __del__(self) -> None:
+        """Release Resources
+        """
+        self._signal_async_stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def __next__(self) -> np.ndarray:
+        """Returns next frame from the bucket
+        Raises:
+            StopIteration: No more frames to read
+        Returns:
+            np.ndarray: frame read from bucket
+        """
+        if self._frame_count >= self._num_files:
+            raise StopIteration
+        frame = self.read()
+        if frame is None:
+            raise StopIteration
+        return frame
+
+    def __iter__(self) -> "ReaderInterface":
+        """Returns iterable object for reading frames
+        Returns:
+            Iterable[ReaderInterface]: iterable object for reading frames
+        """
+        self._frame_count = 0
+        self._is_open = None
+        self._reset_pending()
+        return self
+
+    def __repr__(self) -> str:
+        """Source's Info
+        Returns:
+            str: info
+        """
+        return str(self._info)
+
+    def __str__(self) -> str:
+        """Source's Info
+        Returns:
+            str: Info
+        """
+        return str(self._info)
+
+    def __enter__(self) -> "ReaderInterface":
+        """Returns Conext for "with" block usage
+        Returns:
+            ReaderInterface: S3 Image Reader object
+        """
+        return self
+
+    def __exit__(self, exc_type: None, exc_value: None,
+                 traceback: None) -> None:
+        """Release resources before exiting the "with" block
+        Args:
+            exc_type (NoneType): Exception type if any
+            exc_value (NoneType): Exception value if any
+            traceback (NoneType): Traceback of Exception
+        """
+        self.release()
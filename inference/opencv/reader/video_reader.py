@@ -1,14 +1,19 @@
 from __future__ import annotations
 import os
+import time
+import threading
+from collections import deque
 
 import cv2
 import numpy as np
 
 from inference.interface.reader import ReaderInterface
+from .frame_cache import FrameCache
+from .async_reader import AsyncReaderMixin
 
 WEBCAM = 0
 
-class VideoReader(ReaderInterface):
+class VideoReader(AsyncReaderMixin, ReaderInterface):
     """
     Video Reading wrapper around Opencv-Backend
     """
@@ -19,6 +24,11 @@ class VideoReader(ReaderInterface):
                  dynamic_batch: bool = False,
                  width: int | None = None,
                  height: int | None = None,
+                 cache_dir: str | None = None,
+                 cache_scale: float = 1.0,
+                 async_queue_size: int = 4,
+                 live: bool = False,
+                 live_buffer: int = 1,
                  **kwargs) -> None:
         """Initiate Reader object
         Args:
@@ -29,14 +39,26 @@ class VideoReader(ReaderInterface):
             less than batch_size frames (depending on how many frames were left for last batch).
             If set to False, last batch may have some frames made up of zeros to match batch_size.
             Defaults to False.
+            cache_dir (str | None): if set, decoded frames of file sources are cached there and
+            memory-mapped on later runs over the same file. Defaults to None.
+            cache_scale (float): downscale factor applied to frames stored in the cache.
+            async_queue_size (int): frames decoded ahead when iterated with "async for".
+            live (bool): if set to True a background grabber keeps only the newest live_buffer
+            frames and read returns the freshest ones, skipped frames are counted in info.
+            File sources are played back at their fps to stand in for a camera. Defaults to False.
+            live_buffer (int): number of newest frames kept by the grabber in live mode.
         """
         # initiate props
         self._init_props()
 
-        if not os.path.basename(path).split('.')[-1].lower() in self._EXTENSIONS:
-            raise Exception((f"Invalid file extension for {path}. Please check the filename/source-info again."))
+        # set async decode look-ahead
+        self._async_queue_size = async_queue_size
 
         self._name = str(path)
+        self._is_stream = self._name.isdigit() or '://' in self._name
+
+        if not self._is_stream and not os.path.basename(self._name).split('.')[-1].lower() in self._EXTENSIONS:
+            raise Exception((f"Invalid file extension for {path}. Please check the filename/source-info again."))
 
         # set batch
         self._batch_size = batch_size
@@ -46,6 +68,14 @@ class VideoReader(ReaderInterface):
         self._width = width
         self._height = height
 
+        # set live mode
+        self._live = live
+        self._live_frames = deque(maxlen=max(1, live_buffer))
+
+        # set decoded frame cache
+        self._cache_dir = cache_dir
+        self._cache_scale = cache_scale
+
         # open video stream
         self._video_stream = cv2.VideoCapture(
             int(self._name) if self._name.isdigit() else self._name)
@@ -70,6 +100,18 @@ class VideoReader(ReaderInterface):
         self._minutes = 0
         self._batch_size = None
         self._dynamic_batch = False
+        self._cache_dir = None
+        self._cache_scale = 1.0
+        self._cache = None
+        self._is_stream = False
+        self._live = False
+        self._live_frames = None
+        self._live_cond = None
+        self._live_stop = None
+        self._live_thread = None
+        self._live_eos = False
+        self._grabbed_frames = 0
+        self._dropped_frames = 0
 
     def _post_init(self) -> None:
         """Update info property according to currently open video stream
@@ -95,14 +137,74 @@ class VideoReader(ReaderInterface):
         self._fps = self._video_stream.get(cv2.CAP_PROP_FPS)
         self._is_open = bool(self._video_stream.isOpened())
 
+        # live streams have nothing to cache
+        if self._cache_dir is not None and not self._is_stream and not self._live:
+            self._cache = FrameCache(self._name, [self._name], self._cache_dir, self._cache_scale)
+            self._width = int(round(self._width * self._cache_scale))
+            self._height = int(round(self._height * self._cache_scale))
+
         # update info
         self._info = {
             "name": self._name,
             "width": self._width,
             "height": self._height,
-            "fps": self._fps
+            "fps": self._fps,
+            "cached": self._cache is not None and self._cache.is_complete,
+            "live": self._live,
+            "grabbed_frames": self._grabbed_frames,
+            "dropped_frames": self._dropped_frames,
         }
 
+        if self._live:
+            self._start_grabber()
+
+    def _start_grabber(self) -> None:
+        """Start the background grabber of live mode
+        """
+        self._live_cond = threading.Condition()
+        self._live_stop = threading.Event()
+        self._live_thread = threading.Thread(target=self._grab_loop, name='VideoReader-grabber',
+                                             daemon=True)
+        self._live_thread.start()
+
+    def _grab_loop(self) -> None:
+        """Grab frames as they arrive, the oldest frame is dropped when the buffer is full
+        """
+        # files have no natural pace, play them back in real time
+        interval = 1 / self._fps if not self._is_stream and self._fps else 0
+        next_time = time.monotonic()
+        while not self._live_stop.is_set():
+            flag, frame = self._video_stream.read()
+            with self._live_cond:
+                if not flag or frame is None or self._live_stop.is_set():
+                    self._live_eos = True
+                    self._live_cond.notify_all()
+                    return
+                if len(self._live_frames) == self._live_frames.maxlen:
+                    self._dropped_frames += 1
+                self._live_frames.append(frame)
+                self._grabbed_frames += 1
+                self._live_cond.notify_all()
+
+            if interval:
+                next_time += interval
+                time.sleep(max(0, next_time - time.monotonic()))
+
+    def _read_live(self, count: int) -> list[np.ndarray]:
+        """Take up to count freshest frames, older buffered frames are dropped
+        Returns no frames once the stream ended or the reader was released
+        """
+        with self._live_cond:
+            while not self._live_frames and not self._live_eos:
+                self._live_cond.wait()
+            frames = list(self._live_frames)[-count:]
+            self._dropped_frames += len(self._live_frames) - len(frames)
+            self._live_frames.clear()
+
+        self._info["grabbed_frames"] = self._grabbed_frames
+        self._info["dropped_frames"] = self._dropped_frames
+        return frames
+
     @property
     def name(self) -> str:
         """Name of Video Source
@@ -167,6 +269,14 @@ class VideoReader(ReaderInterface):
         """
         return self.seconds / 60.0
 
+    @property
+    def dropped_frames(self) -> int:
+        """Frames skipped in live mode because a newer frame was available
+        Returns:
+            int: dropped frames' count
+        """
+        return self._dropped_frames
+
     @property
     def video_title(self) -> str:
         """Title of Video
@@ -187,7 +297,22 @@ class VideoReader(ReaderInterface):
         Returns:
             Union[np.ndarry, None]: next frame if available, None otherwise.
         """
-        flag, frame = self._video_stream.read()
+        if self._live:
+            frames = self._read_live(1)
+            frame = frames[0] if frames else None
+            flag = frame is not None
+        elif self._cache is not None and self._cache.is_complete:
+            frame = self._cache.get(self._frame_count)
+            flag = frame is not None
+        else:
+            flag, frame = self._video_stream.read()
+            if self._cache is not None:
+                if frame is None:
+                    self._cache.finalize()
+                else:
+                    frame = self._cache.resize(frame)
+                    self._cache.append(self._frame_count, frame)
+
         self._frame_count += 0 if frame is None else 1
         self._is_open = flag
         return frame
@@ -200,6 +325,9 @@ class VideoReader(ReaderInterface):
         if not self.is_open():
             return None
 
+        if self._live:
+            return self._read_live_batch()
+
         # pre-allocate batch
         batch = np.zeros((self._batch_size, self.height, self.width, 3), dtype="uint8")
 
@@ -219,6 +347,19 @@ class VideoReader(ReaderInterface):
 
         return batch[:i + 1] if self._dynamic_batch else batch
 
+    def _read_live_batch(self) -> np.ndarray | None:
+        """Returns the freshest frames in live mode, oldest first
+        """
+        frames = self._read_live(self._batch_size)
+        self._frame_count += len(frames)
+        if not frames:
+            self._is_open = False
+            return None
+
+        batch = np.zeros((self._batch_size, self.height, self.width, 3), dtype="uint8")
+        batch[:len(frames)] = frames
+        return batch[:len(frames)] if self._dynamic_batch else batch
+
     def read(self) -> np.ndarray | None:
         """Returns next frame or batch of frames from the video if available
         Returns:
@@ -231,23 +372,38 @@ class VideoReader(ReaderInterface):
     def release(self) -> None:
         """Release Resources
         """
+        self._signal_async_stop()
+        if self._live_thread is not None:
+            self._live_stop.set()
+            # wake consumers waiting in _read_live, they get no frames from now on
+            with self._live_cond:
+                self._live_eos = True
+                self._live_cond.notify_all()
+            self._live_thread.join()
+            self._live_thread = None
         if self._video_stream is not None:
             self._video_stream.release()
     
-    def show(self, frame: np.ndarray | None) -> None:
+    def show(self, frame: np.ndarray | None) -> bool:
         """Show video
+        Returns:
+            bool: False once 'q' was pressed and the window closed, True otherwise.
         """
         cv2.imshow(self.video_title, frame)
         if cv2.waitKey(1) & 0xFF == ord('q'):
             self.release()
             cv2.destroyAllWindows()
             print("Exiting...")
+            return False
+        return True
 
     def __del__(self) -> None:
         """Release Resources
         """
         self.release()
         self._video_stream = None
+        if self._cache is not None:
+            self._cache.release()
 
     def __next__(self) -> np.ndarray:
         """Returns next frame from the video
@@ -1,2 +1,5 @@
 from .base_writer import Writer
-from .plot import draw_xyxy_box
\ No newline at end of file
+from .async_writer import AsyncWriter
+from .segmented_writer import SegmentedWriter
+from .image_sink import ImageSink
+from .plot import draw_xyxy_box, draw_key_points, draw_detections
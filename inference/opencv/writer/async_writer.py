@@ -0,0 +1,145 @@
+from __future__ import annotations
+import queue
+import threading
+
+import numpy as np
+
+from .base_writer import Writer
+from .image_sink import ImageSink
+
+_STOP = object()
+
+
+class AsyncWriter(Writer):
+    """
+    Writer that encodes on background threads.
+    Video frames go through one encoder thread so their order is kept, images are
+    encoded in parallel by an ImageSink. Both are bounded, when full the caller either
+    blocks or the frame is dropped and counted.
+    """
+    def __init__(self,
+                 *args,
+                 queue_size: int = 32,
+                 workers: int = 2,
+                 drop_when_full: bool = False,
+                 **kwargs) -> None:
+        """Initiate AsyncWriter object
+        Args:
+            args: passed to Writer
+            queue_size (int): maximum number of frames waiting for each encoder
+            workers (int): number of image encoding threads
+            drop_when_full (bool): if set to True frames are dropped instead of blocking
+            when a queue is full. Defaults to False.
+            kwargs: passed to Writer
+        """
+        super().__init__(*args, **kwargs)
+
+        self._drop_when_full = drop_when_full
+        self._video_queue = queue.Queue(maxsize=queue_size)
+        self._video_thread = threading.Thread(target=self._encode_video, name='AsyncWriter-video', daemon=True)
+        self._video_thread.start()
+
+        self._image_sink = ImageSink(self._image_output_dir, self._image_format, self._image_quality,
+                                     workers=workers, queue_size=queue_size,
+                                     drop_when_full=drop_when_full)
+
+    def _init_props(self) -> None:
+        """
+        Initialize properties.
+        """
+        super()._init_props()
+        self._drop_when_full = False
+        self._video_queue = None
+        self._video_thread = None
+        self._image_sink = None
+        self._dropped_frames = 0
+        self._error = None
+
+    @property
+    def dropped_frames(self) -> int:
+        """Frames dropped because an encoder queue was full
+        Returns:
+            int: dropped frames' count
+        """
+        image_dropped = self._image_sink.dropped_frames if self._image_sink is not None else 0
+        return self._dropped_frames + image_dropped
+
+    @property
+    def image_sink(self) -> ImageSink:
+        """Parallel image output, see its info for throughput
+        Returns:
+            ImageSink: sink used by write_img
+        """
+        return self._image_sink
+
+    def _encode_video(self) -> None:
+        """Video encoder thread body
+        """
+        while True:
+            frame = self._video_queue.get()
+            try:
+                if frame is _STOP:
+                    return
+                if self._error is None:
+                    self._video_writer.write(frame)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._video_queue.task_done()
+
+    def _check_error(self) -> None:
+        """Re-raise an error from the encoder thread on the caller's thread
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def write_vid(self, frame: np.ndarray) -> None:
+        """Queue frame for the output video, the frame must not be modified afterwards
+        Args:
+            frame (np.ndarray): frame to write
+        Raises:
+            Exception: raised when method is called on a non-open writer.
+        """
+        # check if writer is open
+        if not self.is_open():
+            raise Exception("Attempted writing with a non-open Writer.")
+
+        self._check_error()
+        if not self._drop_when_full:
+            self._video_queue.put(frame)
+        else:
+            try:
+                self._video_queue.put_nowait(frame)
+            except queue.Full:
+                self._dropped_frames += 1
+                return
+        self._frame_count += 1
+
+    def write_img(self, frame: np.ndarray) -> None:
+        """Queue frame for image output, the frame must not be modified afterwards
+        Args:
+            frame (np.ndarray): frame to write
+        """
+        self._image_sink.write(frame, self._frame_count)
+
+    def flush(self) -> None:
+        """Wait until every queued frame is encoded
+        """
+        if self._video_queue is not None:
+            self._video_queue.join()
+        if self._image_sink is not None:
+            self._image_sink.flush()
+        self._check_error()
+
+    def release(self) -> None:
+        """Finish queued frames, stop encoder threads and release resources
+        """
+        if self._video_thread is not None:
+            self._video_queue.put(_STOP)
+            self._video_thread.join()
+            self._video_thread = None
+        if self._image_sink is not None:
+            self._image_sink.release()
+        super().release()
+        self._check_error()
@@ -6,9 +6,11 @@ import json
 import numpy as np
 from PIL import Image
 
-from .plot import draw_xyxy_box, draw_key_point
+from .plot import draw_xyxy_box, draw_key_points, draw_detections
+from .image_sink import image_write_params
 from inference.interface.reader import ReaderInterface
 from inference.interface.writer import WriterInterface
+from inference.results import ResultSink, ResultStore
 
 
 class Writer(WriterInterface):
@@ -35,9 +37,13 @@ class Writer(WriterInterface):
                  name: str | None = None,
                  ext: str | None = None,
                  output_dir: str | None = None,
+                 image_format: str = 'jpg',
+                 image_quality: int | None = None,
+                 result_format: str = 'bin',
                  **kwargs) -> None:
 
         self._init_props()
+        self._result_format = result_format
 
         self._update_props(reader, width, height, fps, name, ext, output_dir,
                            **kwargs)
@@ -47,6 +53,8 @@ class Writer(WriterInterface):
                                              (self._width, self._height))
 
         self._image_writer = cv2.imwrite
+        self._image_quality = image_quality
+        self._image_format, self._image_params = image_write_params(image_format, image_quality)
 
         self._update_info()
 
@@ -64,6 +72,14 @@ class Writer(WriterInterface):
         self._frame_count = 0
         self._seconds = 0
         self._minutes = 0
+        self._image_format = 'jpg'
+        self._image_quality = None
+        self._image_params = []
+        self._json_sink = None
+        self._result_sink = None
+        self._result_format = 'bin'
+        self._json_index = 0
+        self._result_index = 0
 
     def _update_props(self,
                       reader: ReaderInterface | None = None,
@@ -242,14 +258,22 @@ class Writer(WriterInterface):
         """
 
         # zero fill frame number
-        file_name = f'{self._image_output_dir}/{str(self._frame_count).zfill(6)}.jpg'
-        self._image_writer(file_name, frame)
+        file_name = f'{self._image_output_dir}/{str(self._frame_count).zfill(6)}.{self._image_format}'
+        self._image_writer(file_name, frame, self._image_params)
 
     def release(self) -> None:
         """Release Resources
         """
         if self._video_writer is not None:
             self._video_writer.release()
+        for sink in (self._json_sink, self._result_sink):
+            if sink is not None:
+                sink.close()
+        # a later save starts new result files
+        self._json_sink = None
+        self._result_sink = None
+        self._json_index = 0
+        self._result_index = 0
 
     def draw_bbox(self, image: Image, xyxy: tuple[str | int], label: str, box_id: int) -> None:
         """Draw bounding box on output video
@@ -257,8 +281,24 @@ class Writer(WriterInterface):
         draw_xyxy_box(image, xyxy, label, box_id)
     
     def draw_key_points(self, image: Image, key_point: dict[str, tuple[int, int]], size: int=5) -> None:
-        for point_id, value in key_point.items():
-            draw_key_point(image, point_id, value, size)
+        """Draw key points of one person on output video
+        """
+        draw_key_points(image, [key_point], size)
+
+    def draw_detections(self, image: Image, boxes: np.ndarray, ids: np.ndarray,
+                        labels: list[str] | None = None,
+                        key_points: np.ndarray | list[dict[str, tuple[int, int]]] | None = None,
+                        size: int = 5) -> None:
+        """Draw every box, label and key point of a frame in one batched pass
+        Args:
+            image (Image): image to draw on
+            boxes (np.ndarray): (N, 4) xyxy boxes
+            ids (np.ndarray): (N,) box ids, used for colors
+            labels (list[str] | None): N labels, defaults to the ids
+            key_points (np.ndarray | list[dict] | None): (N, K, 2) array or list of {point_id: xy}
+            size (int): radius of key points
+        """
+        draw_detections(image, boxes, ids, labels, key_points, size)
     
     def save_txt(self, outputs: list[str]) -> None:
         """Save bounding box on output video
@@ -268,11 +308,42 @@ class Writer(WriterInterface):
             for output in outputs:
                 f.write(output + '\n')
     
-    def save_json(self, outputs: list[str]) -> None:
-        """Save bounding box on output video
+    def save_json(self, outputs: list[dict], frame_index: int | None = None) -> None:
+        """Append results of one frame to one json-lines file
+        Args:
+            outputs (list[dict]): results of the frame
+            frame_index (int | None): frame the results belong to, defaults to the one after
+            the previously saved frame
         """
-        pass
+        if self._json_sink is None:
+            self._json_sink = ResultSink(f'{self._result_file_name}.jsonl', fmt='jsonl')
+
+        # numbered per save call unless given, independent of the video frame counter
+        frame_index = self._json_index if frame_index is None else frame_index
+        self._json_index = frame_index + 1
+        self._json_sink.write(frame_index, outputs)
 
+    def save_results(self, outputs: np.ndarray, frame_index: int | None = None) -> None:
+        """Append results of one frame to one binary records file,
+        or to a chunked ResultStore directory when result_format is 'store'
+        Args:
+            outputs (np.ndarray): rows of [x0, y0, x1, y1, conf, cls(, track_id)]
+            frame_index (int | None): frame the results belong to, defaults to the one after
+            the previously saved frame
+        """
+        if self._result_sink is None:
+            if self._result_format == 'store':
+                self._result_sink = ResultStore(f'{self._result_file_name}.store', mode='w')
+            else:
+                self._result_sink = ResultSink(f'{self._result_file_name}.bin', fmt='bin')
+
+        # numbered per save call unless given, independent of the video frame counter
+        frame_index = self._result_index if frame_index is None else frame_index
+        self._result_index = frame_index + 1
+        if self._result_format == 'store':
+            self._result_sink.append(frame_index, outputs)
+        else:
+            self._result_sink.write(frame_index, outputs)
 
     def __del__(self) -> None:
         """Release Resources
@@ -0,0 +1,191 @@
+from __future__ import annotations
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+IMAGE_FORMAT_PARAMS = {
+    "jpg": cv2.IMWRITE_JPEG_QUALITY,
+    "jpeg": cv2.IMWRITE_JPEG_QUALITY,
+    "png": cv2.IMWRITE_PNG_COMPRESSION,
+    "webp": cv2.IMWRITE_WEBP_QUALITY,
+}
+
+
+def image_write_params(image_format: str, quality: int | None = None) -> tuple[str, list[int]]:
+    """Normalized format and cv2.imwrite params
+    Args:
+        image_format (str): jpg, png or webp
+        quality (int | None): jpg/webp quality (0-100) or png compression level (0-9),
+        None keeps the OpenCV default
+    Returns:
+        tuple[str, list[int]]: format without dot and imwrite params
+    """
+    image_format = image_format.lower().lstrip('.')
+    if image_format not in IMAGE_FORMAT_PARAMS:
+        raise Exception(f"Unsupported image format {image_format}, use one of {sorted(IMAGE_FORMAT_PARAMS)}.")
+    params = [] if quality is None else [IMAGE_FORMAT_PARAMS[image_format], int(quality)]
+    return image_format, params
+
+
+class ImageSink:
+    """
+    Parallel per-frame image output.
+    Frames are encoded by a thread pool (OpenCV releases the GIL while encoding),
+    file names only depend on the frame index so output is deterministic.
+    """
+    def __init__(self,
+                 output_dir: str,
+                 image_format: str = "jpg",
+                 quality: int | None = None,
+                 workers: int | None = None,
+                 queue_size: int | None = None,
+                 drop_when_full: bool = False,
+                 digits: int = 6) -> None:
+        """Initiate ImageSink object
+        Args:
+            output_dir (str): directory images are written to
+            image_format (str): jpg, png or webp
+            quality (int | None): jpg/webp quality (0-100) or png compression level (0-9),
+            None keeps the OpenCV default
+            workers (int | None): number of encoding threads, defaults to the cpu count
+            queue_size (int | None): frames waiting or being encoded before write blocks
+            or drops, defaults to twice the workers
+            drop_when_full (bool): drop frames instead of blocking when the queue is full
+            digits (int): zero fill of the frame index in file names
+        """
+        self._output_dir = output_dir
+        self._format, self._params = image_write_params(image_format, quality)
+        self._workers = workers or os.cpu_count() or 1
+        self._drop_when_full = drop_when_full
+        self._digits = digits
+
+        self._slots = threading.Semaphore(queue_size or self._workers * 2)
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='ImageSink')
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._written = 0
+        self._dropped = 0
+        self._first_time = None
+        self._last_time = None
+        self._error = None
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    def file_name(self, index: int) -> str:
+        """Output path of a frame
+        Args:
+            index (int): frame index
+        Returns:
+            str: path of the image file
+        """
+        return os.path.join(self._output_dir, f'{str(index).zfill(self._digits)}.{self._format}')
+
+    @property
+    def frames_written(self) -> int:
+        """Frames encoded and written so far
+        Returns:
+            int: written frames' count
+        """
+        return self._written
+
+    @property
+    def dropped_frames(self) -> int:
+        """Frames dropped because the queue was full
+        Returns:
+            int: dropped frames' count
+        """
+        return self._dropped
+
+    @property
+    def fps(self) -> float:
+        """Sustained throughput from the first queued frame to the last written one
+        Returns:
+            float: written frames per second
+        """
+        if self._first_time is None or self._last_time is None or self._last_time <= self._first_time:
+            return 0.0
+        return self._written / (self._last_time - self._first_time)
+
+    @property
+    def info(self) -> dict:
+        """Sink information
+        Returns:
+            dict: format, workers and throughput stats
+        """
+        return {
+            "output_dir": self._output_dir,
+            "format": self._format,
+            "workers": self._workers,
+            "frames_written": self._written,
+            "dropped_frames": self._dropped,
+            "fps": self.fps,
+        }
+
+    def _encode(self, file_name: str, frame: np.ndarray) -> None:
+        """Encoder thread body
+        """
+        written = False
+        try:
+            if not cv2.imwrite(file_name, frame, self._params):
+                raise Exception(f"Failed to write {file_name}.")
+            written = True
+        except Exception as e:
+            self._error = self._error or e
+        finally:
+            self._slots.release()
+            with self._lock:
+                self._in_flight -= 1
+                # failed writes do not count towards frames_written and fps
+                if written:
+                    self._written += 1
+                    self._last_time = time.perf_counter()
+                self._idle.notify_all()
+
+    def _check_error(self) -> None:
+        """Re-raise an error from an encoder thread on the caller's thread
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def write(self, frame: np.ndarray, index: int) -> bool:
+        """Queue a frame, the frame must not be modified afterwards
+        Args:
+            frame (np.ndarray): frame to write
+            index (int): frame index used for the file name
+        Returns:
+            bool: False if the frame was dropped
+        """
+        self._check_error()
+        if not self._slots.acquire(blocking=not self._drop_when_full):
+            self._dropped += 1
+            return False
+
+        with self._lock:
+            self._in_flight += 1
+            if self._first_time is None:
+                self._first_time = time.perf_counter()
+        self._executor.submit(self._encode, self.file_name(index), frame)
+        return True
+
+    def flush(self) -> None:
+        """Wait until every queued frame is written
+        """
+        with self._idle:
+            while self._in_flight:
+                self._idle.wait()
+        self._check_error()
+
+    def release(self) -> None:
+        """Write remaining frames and stop the encoder threads
+        """
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._check_error()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+
+class LabelSprite:
+    """
+    Pre-rendered label (background box plus anti-aliased text).
+    Drawing it is one blend over a small block: the opaque label box copies its color,
+    anti-aliased edges and glyph overhangs keep their partial coverage.
+    """
+    __slots__ = ('offset', 'shape', 'inv_alpha', 'premul', 'inv_alpha_gray', 'premul_gray')
+
+    # BGR -> gray weights, as used by cv2.cvtColor
+    _GRAY_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+    def __init__(self, render: Callable[[np.ndarray, int, int], None], margin: tuple[int, int, int, int]) -> None:
+        """Render a label on black and white canvases to recover color and coverage
+        Args:
+            render (Callable): draws the label on an image given the (x0, y0) anchor
+            margin (tuple[int, int, int, int]): left, top, right, bottom canvas extent around the anchor
+        """
+        left, top, right, bottom = margin
+        size = (top + bottom, left + right, 3)
+        on_black = np.zeros(size, dtype=np.uint8)
+        on_white = np.full(size, 255, dtype=np.uint8)
+        render(on_black, left, top)
+        render(on_white, left, top)
+
+        # out = frame * (1 - alpha) + premul, premul is what lands on a black frame
+        self.offset = (-left, -top)
+        self.shape = size[:2]
+        self.inv_alpha = (on_white.astype(np.float32) - on_black) / 255.0
+        self.premul = on_black.astype(np.float32) + 0.5
+        self.inv_alpha_gray = self.inv_alpha.mean(-1)
+        self.premul_gray = on_black.astype(np.float32) @ self._GRAY_WEIGHTS + 0.5
+
+    def blit(self, img: np.ndarray, x: int, y: int) -> None:
+        """Draw the sprite anchored at (x, y), clipped to the image
+        Args:
+            img (np.ndarray): BGR (H, W, 3) or grayscale (H, W) / (H, W, 1) image
+            x (int): anchor x
+            y (int): anchor y
+        Raises:
+            Exception: raised for images that are neither BGR nor grayscale
+        """
+        channels = 1 if img.ndim == 2 else img.shape[2]
+        if channels not in (1, 3):
+            raise Exception(f"Label sprites need a BGR or grayscale image, got shape {img.shape}.")
+        height, width = img.shape[:2]
+        ox, oy = x + self.offset[0], y + self.offset[1]
+        x0, y0 = max(ox, 0), max(oy, 0)
+        x1, y1 = min(ox + self.shape[1], width), min(oy + self.shape[0], height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        roi = img[y0:y1, x0:x1]
+        sy, sx = slice(y0 - oy, y1 - oy), slice(x0 - ox, x1 - ox)
+        if channels == 3:
+            roi[...] = roi * self.inv_alpha[sy, sx] + self.premul[sy, sx]
+        elif img.ndim == 2:
+            roi[...] = roi * self.inv_alpha_gray[sy, sx] + self.premul_gray[sy, sx]
+        else:
+            roi[...] = roi * self.inv_alpha_gray[sy, sx, None] + self.premul_gray[sy, sx, None]
+
+
+class LabelSpriteCache:
+    """
+    Bounded LRU cache of LabelSprite keyed by label text and color.
+    Safe to share between writer threads, sprites are built outside the lock.
+    """
+    def __init__(self, maxsize: int = 1024) -> None:
+        """Initiate LabelSpriteCache object
+        Args:
+            maxsize (int): maximum number of sprites kept
+        """
+        self._maxsize = maxsize
+        self._sprites = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def get(self, key: tuple, build: Callable[[], LabelSprite]) -> LabelSprite:
+        """Returns the cached sprite or builds it
+        Args:
+            key (tuple): hashable label and color key
+            build (Callable[[], LabelSprite]): renders the sprite on a miss
+        Returns:
+            LabelSprite: sprite for the key
+        """
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                self.hits += 1
+                return sprite
+            self.misses += 1
+
+        sprite = build()
+        with self._lock:
+            # another thread may have built the same sprite meanwhile, keep the first one
+            sprite = self._sprites.setdefault(key, sprite)
+            self._sprites.move_to_end(key)
+            if len(self._sprites) > self._maxsize:
+                self._sprites.popitem(last=False)
+        return sprite
+
+    def clear(self) -> None:
+        """Drop every sprite
+        """
+        with self._lock:
+            self._sprites.clear()
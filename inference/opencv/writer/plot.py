@@ -1,9 +1,12 @@
 from __future__ import annotations
+from functools import lru_cache
 
 import cv2
 import numpy as np
 from PIL import Image
 
+from .label_cache import LabelSprite, LabelSpriteCache
+
 
 def get_color(idx):
     idx = idx * 3
@@ -12,42 +15,87 @@ def get_color(idx):
     return color
 
 
-def draw_xyxy_box(img: Image, box: list[int], label: str, box_id: int):
-    """
-        img : input img
-        box : xyxy box
-        label : box label
-        box_id : box id
-    """
-    x0, y0, x1, y1 = map(int, box)
-    _color = get_color(box_id)
-    color = _color.tolist()
-    txt_bk_color = (_color * 0.7).astype(np.uint8).tolist()
-    txt_color = (255, 255, 255)
-    font = cv2.FONT_HERSHEY_SIMPLEX
+# get_color repeats every 255 ids, so one table covers every id
+_NUM_COLORS = 255
+COLOR_TABLE = np.stack([get_color(i) for i in range(_NUM_COLORS)])
+TEXT_BK_COLOR_TABLE = (COLOR_TABLE * 0.7).astype(np.uint8)
+_COLORS = COLOR_TABLE.tolist()
+_TEXT_BK_COLORS = TEXT_BK_COLOR_TABLE.tolist()
 
-    tl = 1
-    tf = max(tl - 1, 1)
+_TXT_COLOR = (255, 255, 255)
+_LINE_WIDTH = 1
+_FONT_THICKNESS = max(_LINE_WIDTH - 1, 1)
+_FONT_SCALE = _LINE_WIDTH / 3
 
-    # bounding box
-    cv2.rectangle(img, (x0, y0), (x1, y1), color, tl * 2)
 
-    # label box
-    t_size = cv2.getTextSize(label, 0, fontScale=tl / 3, thickness=tf)[0]
+@lru_cache(maxsize=4096)
+def label_size(label: str) -> tuple[int, int]:
+    """Cached cv2.getTextSize of a box label
+    """
+    return cv2.getTextSize(label, 0, fontScale=_FONT_SCALE, thickness=_FONT_THICKNESS)[0]
+
+
+def _render_label(img: Image, x0: int, y0: int, label: str, color_idx: int):
+    """Label background and text above a box
+    """
+    t_size = label_size(label)
     cbox1 = [x0, y0]
     cbox2 = [x0 + t_size[0], y0 - t_size[1] - 3]
-    cv2.rectangle(img, cbox1, cbox2, txt_bk_color, -1, lineType=cv2.LINE_AA)
+    cv2.rectangle(img, cbox1, cbox2, _TEXT_BK_COLORS[color_idx], -1, lineType=cv2.LINE_AA)
     cv2.putText(
         img,
         label,
         (cbox1[0], cbox1[1] - 2),
         0,
-        tl / 3,
-        txt_color,
-        thickness=tf,
+        _FONT_SCALE,
+        _TXT_COLOR,
+        thickness=_FONT_THICKNESS,
         lineType=cv2.LINE_AA,
     )
 
+
+label_sprites = LabelSpriteCache()
+
+
+@lru_cache(maxsize=4096)
+def _label_margin(label: str) -> tuple[int, int, int, int]:
+    """Left, top, right, bottom extent of a label around its anchor
+    """
+    t_size = label_size(label)
+    baseline = cv2.getTextSize(label, 0, fontScale=_FONT_SCALE, thickness=_FONT_THICKNESS)[1]
+    # room for anti-aliased edges and descenders around the label box
+    return (2, t_size[1] + 5, t_size[0] + 3, baseline + 3)
+
+
+def _build_label_sprite(label: str, color_idx: int) -> LabelSprite:
+    """Render a label once into a sprite
+    """
+    return LabelSprite(lambda img, x0, y0: _render_label(img, x0, y0, label, color_idx), _label_margin(label))
+
+
+def _draw_label(img: Image, x0: int, y0: int, label: str, color_idx: int):
+    """Blit the cached label sprite above a box
+    """
+    sprite = label_sprites.get((label, color_idx), lambda: _build_label_sprite(label, color_idx))
+    sprite.blit(img, x0, y0)
+
+
+def draw_xyxy_box(img: Image, box: list[int], label: str, box_id: int):
+    """
+        img : input img
+        box : xyxy box
+        label : box label
+        box_id : box id
+    """
+    x0, y0, x1, y1 = map(int, box)
+    color_idx = int(box_id) % _NUM_COLORS
+
+    # bounding box
+    cv2.rectangle(img, (x0, y0), (x1, y1), _COLORS[color_idx], _LINE_WIDTH * 2)
+
+    # label box
+    _draw_label(img, x0, y0, label, color_idx)
+
 def draw_key_point(img: Image, point_id: int, point: tuple[int, int], size: int = 5):
     """
         img : input img
@@ -55,6 +103,108 @@ def draw_key_point(img: Image, point_id: int, point: tuple[int, int], size: int
         point : xy point
     """
     x, y = map(int, point)
-    _color = get_color(int(point_id))
-    color = _color.tolist()
-    cv2.circle(img, (x, y), size, color, -1)
\ No newline at end of file
+    color = _COLORS[int(point_id) % _NUM_COLORS]
+    cv2.circle(img, (x, y), size, color, -1)
+
+
+def _key_point_arrays(keypoints: np.ndarray | list[dict[str, tuple[int, int]]]) -> tuple[np.ndarray, np.ndarray]:
+    """Flatten keypoints into (M, 2) points and (M,) point ids in drawing order
+    """
+    if isinstance(keypoints, np.ndarray):
+        # (N, K, 2) array, the point id is the position along K
+        num_points = keypoints.shape[-2]
+        points = keypoints.reshape(-1, 2)
+        point_ids = np.tile(np.arange(num_points), len(points) // max(num_points, 1))
+        valid = np.isfinite(points).all(axis=1)
+        return points[valid], point_ids[valid]
+
+    points, point_ids = [], []
+    for key_point in keypoints:
+        for point_id, value in key_point.items():
+            point_ids.append(int(point_id))
+            points.append(value)
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2), np.asarray(point_ids, dtype=np.int64)
+
+
+def draw_key_points(img: Image, keypoints: np.ndarray | list[dict[str, tuple[int, int]]], size: int = 5):
+    """
+        img : input img
+        keypoints : (N, K, 2) array (NaN for missing points) or list of {point_id: xy} dicts
+        size : radius of points
+    """
+    points, point_ids = _key_point_arrays(keypoints)
+
+    # convert once, the loop is left with nothing but the cv2 calls
+    # (numpy stamping of disks measured slower than cv2.circle for small radii)
+    circle = cv2.circle
+    points = points.astype(np.int64).tolist()
+    color_idx = (point_ids % _NUM_COLORS).tolist()
+    for (x, y), idx in zip(points, color_idx):
+        circle(img, (x, y), size, _COLORS[idx], -1)
+
+
+def _independent_runs(boxes: np.ndarray, color_idx: np.ndarray, labels: list[str]) -> list[tuple[int, int]]:
+    """Split detections into consecutive runs whose boxes can be drawn before their labels.
+    Within a run no box touches an earlier label or an earlier box of another color, so
+    drawing all boxes then all labels gives the same pixels as box, label per detection.
+    """
+    num = len(boxes)
+    if num < 2:
+        return [(0, num)]
+    # conservative extents as [x0, y0, x1, y1), box strokes reach _LINE_WIDTH past the corners
+    pad = _LINE_WIDTH * 2
+    box_rects = np.concatenate([np.minimum(boxes[:, :2], boxes[:, 2:]) - pad,
+                                np.maximum(boxes[:, :2], boxes[:, 2:]) + pad + 1], axis=1)
+    margins = np.array([_label_margin(label) for label in labels], dtype=np.int64).reshape(-1, 4)
+    label_rects = np.stack([boxes[:, 0] - margins[:, 0], boxes[:, 1] - margins[:, 1],
+                            boxes[:, 0] + margins[:, 2], boxes[:, 1] + margins[:, 3]], axis=1)
+
+    def intersects(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return ((a[:, None, 0] < b[None, :, 2]) & (b[None, :, 0] < a[:, None, 2]) &
+                (a[:, None, 1] < b[None, :, 3]) & (b[None, :, 1] < a[:, None, 3]))
+
+    # conflict[i, j]: box j may not be drawn before label i or box i
+    conflict = intersects(label_rects, box_rects)
+    conflict |= intersects(box_rects, box_rects) & (color_idx[:, None] != color_idx[None, :])
+
+    runs, start = [], 0
+    for j in range(1, num):
+        if conflict[start:j, j].any():
+            runs.append((start, j))
+            start = j
+    runs.append((start, num))
+    return runs
+
+
+def draw_detections(img: Image,
+                    boxes: np.ndarray | list[list[int]],
+                    ids: np.ndarray | list[int],
+                    labels: list[str] | None = None,
+                    keypoints: np.ndarray | list[dict[str, tuple[int, int]]] | None = None,
+                    key_point_size: int = 5):
+    """
+        img : input img
+        boxes : (N, 4) xyxy boxes
+        ids : (N,) box ids, used for colors
+        labels : N labels, defaults to the ids
+        keypoints : (N, K, 2) array or list of {point_id: xy} dicts, drawn after the boxes
+        key_point_size : radius of key points
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4).astype(np.int32)
+    ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+    if labels is None:
+        labels = [str(box_id) for box_id in ids.tolist()]
+    color_idx = ids % _NUM_COLORS
+
+    # one polylines call per color draws the same pixels as cv2.rectangle
+    corners = boxes[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 2)
+    for start, stop in _independent_runs(boxes, color_idx, labels):
+        run_colors = color_idx[start:stop]
+        for idx in np.unique(run_colors).tolist():
+            cv2.polylines(img, list(corners[start:stop][run_colors == idx]), True, _COLORS[idx], _LINE_WIDTH * 2)
+        for (x0, y0), label, idx in zip(boxes[start:stop, :2].tolist(), labels[start:stop],
+                                        run_colors.tolist()):
+            _draw_label(img, x0, y0, label, idx)
+
+    if keypoints is not None:
+        draw_key_points(img, keypoints, key_point_size)
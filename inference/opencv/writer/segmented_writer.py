@@ -0,0 +1,189 @@
+from __future__ import annotations
+import os
+import json
+import time
+import threading
+
+import cv2
+import numpy as np
+
+from inference.interface.reader import ReaderInterface
+from .base_writer import Writer
+
+
+class SegmentedWriter(Writer):
+    """
+    Writer that rotates the output video every N frames or seconds.
+    The next segment's VideoWriter is opened ahead of time on a background thread and
+    finished segments are released in the background, so rotation costs one swap.
+    A json manifest lists every segment with its frame and time range.
+    """
+    def __init__(self,
+                 *args,
+                 segment_frames: int | None = None,
+                 segment_seconds: float | None = None,
+                 **kwargs) -> None:
+        """Initiate SegmentedWriter object
+        Args:
+            args: passed to Writer
+            segment_frames (int | None): frames per segment
+            segment_seconds (float | None): seconds per segment, converted to frames with fps
+            kwargs: passed to Writer
+        """
+        super().__init__(*args, segment_frames=segment_frames, segment_seconds=segment_seconds, **kwargs)
+
+        self._start_segment(0, self._video_writer_file)
+        self._prepare_next()
+
+    def _init_props(self) -> None:
+        """
+        Initialize properties.
+        """
+        super()._init_props()
+        self._segment_frames = None
+        self._segment_root = None
+        self._segment_ext = None
+        self._video_writer_file = None
+        self._segments = []
+        self._segment_start_frame = 0
+        self._next_writer = None
+        self._next_file = None
+        self._next_thread = None
+        self._release_threads = []
+        self._manifest_file = None
+
+    def _update_props(self,
+                      reader: ReaderInterface | None = None,
+                      width: int | None = None,
+                      height: int | None = None,
+                      fps: float | None = None,
+                      name: str | None = None,
+                      ext: str | None = None,
+                      output_dir: str | None = None,
+                      segment_frames: int | None = None,
+                      segment_seconds: float | None = None,
+                      **kwargs) -> None:
+        """
+        Update properties, the first segment replaces the single output video.
+        """
+        super()._update_props(reader, width, height, fps, name, ext, output_dir, **kwargs)
+
+        if segment_frames is None and segment_seconds is not None:
+            segment_frames = int(round(segment_seconds * self._fps))
+        if not segment_frames or segment_frames <= 0:
+            raise AssertionError("Must provide a positive segment_frames or segment_seconds.")
+        self._segment_frames = segment_frames
+
+        self._segment_root, self._segment_ext = os.path.splitext(self._video_file_name)
+        self._manifest_file = f'{self._segment_root}_segments.json'
+        self._video_file_name = self._segment_file(0)
+        self._video_writer_file = self._video_file_name
+
+    def _segment_file(self, index: int) -> str:
+        """Path of a segment
+        """
+        return f'{self._segment_root}_{str(index).zfill(5)}{self._segment_ext}'
+
+    def _open_writer(self, file_name: str) -> cv2.VideoWriter:
+        """Open a VideoWriter with the writer's settings
+        """
+        return cv2.VideoWriter(file_name, self._fourcc(), self._fps, (self._width, self._height))
+
+    def _prepare_next(self) -> None:
+        """Open the next segment's writer on a background thread
+        """
+        index = len(self._segments)
+        self._next_file = self._segment_file(index)
+
+        def open_next():
+            self._next_writer = self._open_writer(self._next_file)
+
+        self._next_writer = None
+        self._next_thread = threading.Thread(target=open_next, name='SegmentedWriter-open', daemon=True)
+        self._next_thread.start()
+
+    def _start_segment(self, index: int, file_name: str) -> None:
+        """Add a manifest entry for a new segment
+        """
+        self._segment_start_frame = self._frame_count
+        self._segments.append({
+            "index": index,
+            "file": os.path.basename(file_name),
+            "start_frame": self._frame_count,
+            "end_frame": None,
+            "start_time": self._frame_count / self._fps if self._fps else 0,
+            "end_time": None,
+            "wall_start": time.time(),
+            "wall_end": None,
+        })
+
+    def _end_segment(self) -> None:
+        """Close the manifest entry of the current segment
+        """
+        segment = self._segments[-1]
+        segment["end_frame"] = self._frame_count
+        segment["end_time"] = self._frame_count / self._fps if self._fps else 0
+        segment["wall_end"] = time.time()
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        """Atomically rewrite the segment manifest
+        """
+        tmp_file = self._manifest_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump({"name": self._name, "fps": self._fps, "segment_frames": self._segment_frames,
+                       "segments": self._segments}, f, indent=1)
+        os.replace(tmp_file, self._manifest_file)
+
+    def _rotate(self) -> None:
+        """Swap in the pre-opened writer and release the finished one in the background
+        """
+        self._end_segment()
+
+        self._next_thread.join()
+        finished, self._video_writer = self._video_writer, self._next_writer
+        self._video_writer_file = self._next_file
+
+        thread = threading.Thread(target=finished.release, name='SegmentedWriter-release', daemon=True)
+        thread.start()
+        self._release_threads = [t for t in self._release_threads if t.is_alive()] + [thread]
+
+        self._start_segment(len(self._segments), self._video_writer_file)
+        self._write_manifest()
+        self._prepare_next()
+
+    @property
+    def segments(self) -> list[dict]:
+        """Manifest entries of every segment so far
+        Returns:
+            list[dict]: index, file, frame range and time range per segment
+        """
+        return self._segments
+
+    def write_vid(self, frame: np.ndarray) -> None:
+        """Write frame to the current segment, rotating first if it is full
+        Args:
+            frame (np.ndarray): frame to write
+        """
+        if self._frame_count - self._segment_start_frame >= self._segment_frames:
+            self._rotate()
+        super().write_vid(frame)
+
+    def release(self) -> None:
+        """Finish the current segment and release resources
+        """
+        if self._next_thread is not None:
+            self._next_thread.join()
+            self._next_thread = None
+            # the pre-opened segment never received a frame
+            if self._next_writer is not None:
+                self._next_writer.release()
+                self._next_writer = None
+            if os.path.exists(self._next_file):
+                os.remove(self._next_file)
+            self._end_segment()
+
+        super().release()
+        for thread in self._release_threads:
+            thread.join()
+        self._release_threads = []
@@ -0,0 +1,5 @@
+from .stage import Stage, StageStats
+from .pipeline import Pipeline
+from .scheduler import BatchScheduler, LatencyModel
+from .detection import build_detection_pipeline, make_batch_detector, non_max_suppression, to_det
+from .jobs import JobRunner, SourceResult, configure_threads, process_source
@@ -0,0 +1,239 @@
+from __future__ import annotations
+import queue
+from functools import partial
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+
+from detector.det import Det
+from inference.interface.writer import WriterInterface
+from inference.preprocess import Letterbox, scale_boxes
+from .stage import Stage
+from .pipeline import Pipeline
+
+# class offset of batched NMS, boxes of different classes never overlap
+_CLASS_OFFSET = 4096
+
+
+def non_max_suppression(pred: np.ndarray, conf_thres: float = 0.25, iou_thres: float = 0.45,
+                        max_det: int = 300) -> np.ndarray:
+    """Class-aware NMS of one image's raw Darknet output
+    Args:
+        pred (np.ndarray): (N, 5 + nc) rows of cx, cy, w, h, objectness and class scores
+        conf_thres (float): minimum objectness * class score
+        iou_thres (float): IoU above which the lower scored box is dropped
+        max_det (int): maximum number of kept boxes
+    Returns:
+        np.ndarray: (M, 6) rows of x0, y0, x1, y1, conf, cls
+    """
+    pred = pred[pred[:, 4] > conf_thres]
+    scores = pred[:, 5:] * pred[:, 4:5]
+    cls = scores.argmax(1)
+    conf = scores[np.arange(len(scores)), cls]
+    keep = conf > conf_thres
+    pred, cls, conf = pred[keep], cls[keep], conf[keep]
+    if len(pred) == 0:
+        return np.zeros((0, 6), dtype=np.float32)
+
+    xywh = pred[:, :4].astype(np.float32)
+    xywh[:, :2] -= xywh[:, 2:] / 2
+    offset = xywh.copy()
+    offset[:, :2] += cls[:, None] * _CLASS_OFFSET
+    indices = np.asarray(cv2.dnn.NMSBoxes(offset.tolist(), conf.tolist(), conf_thres, iou_thres,
+                                          top_k=max_det), dtype=np.int64).reshape(-1)
+
+    out = np.empty((len(indices), 6), dtype=np.float32)
+    out[:, :2] = xywh[indices, :2]
+    out[:, 2:4] = xywh[indices, :2] + xywh[indices, 2:]
+    out[:, 4] = conf[indices]
+    out[:, 5] = cls[indices]
+    return out
+
+
+def to_det(pred: np.ndarray, meta: Any, filter_cls: list[int], conf_thres: float = 0.25,
+           iou_thres: float = 0.45) -> Det:
+    """NMS one image's raw output, map boxes back to the source frame and filter classes
+    Args:
+        pred (np.ndarray): (N, 5 + nc) raw Darknet rows of one image
+        meta (LetterboxMeta): letterbox metadata of the image
+        filter_cls (list[int]): classes kept
+        conf_thres (float): NMS confidence threshold
+        iou_thres (float): NMS IoU threshold
+    Returns:
+        Det: detections in source frame coordinates
+    """
+    boxes = non_max_suppression(pred, conf_thres, iou_thres)
+    boxes[:, :4] = scale_boxes(boxes[:, :4], meta)
+    return Det(filter_cls, boxes)
+
+
+def make_batch_detector(model: Any,
+                        max_batch_size: int = 8,
+                        img_size: int | tuple[int, int] = 640,
+                        device: str = 'cpu',
+                        half: bool = False,
+                        filter_cls: list[int] = (0,),
+                        conf_thres: float = 0.25,
+                        iou_thres: float = 0.45) -> Callable[[list[np.ndarray]], list[Det]]:
+    """Batch function for BatchScheduler, letterboxes up to max_batch_size frames into one
+    preallocated input and runs a single Darknet forward pass. Not thread safe, call it from one thread.
+    Args:
+        model (Any): Darknet model on device, see models.import_model.get_darknet
+        max_batch_size (int): largest batch, size of the input buffer
+        img_size (int | tuple[int, int]): model input size as int or (width, height)
+        device (str): torch device of the model
+        half (bool): feed float16 inputs
+        filter_cls (list[int]): classes kept by Det
+        conf_thres (float): NMS confidence threshold
+        iou_thres (float): NMS IoU threshold
+    Returns:
+        Callable[[list[np.ndarray]], list[Det]]: frames to one Det per frame
+    """
+    width, height = (img_size, img_size) if isinstance(img_size, int) else img_size
+    letterbox = Letterbox(max_batch_size, width, height)
+    filter_cls = list(filter_cls)
+    model.eval()
+
+    def detect(frames: list[np.ndarray]) -> list[Det]:
+        import torch
+
+        tensor, metas = letterbox(frames)
+        x = torch.from_numpy(tensor).to(device)
+        x = x.half() if half else x
+        with torch.no_grad():
+            preds = model(x)[0].float().cpu().numpy()
+        return [to_det(pred, meta, filter_cls, conf_thres, iou_thres) for pred, meta in zip(preds, metas)]
+    return detect
+
+
+def _preprocess(width: int, height: int, ring_size: int) -> Callable[[], Callable]:
+    """Per-worker letterbox into a ring of preallocated input slots.
+    A slot travels with its frame and is handed back by the inference stage after the
+    forward pass. When every slot is in flight, the spare last slot is filled and copied.
+    """
+    def factory():
+        letterbox = Letterbox(ring_size + 1, width, height)
+        free = queue.SimpleQueue()
+        for slot in range(ring_size):
+            free.put(slot)
+
+        def preprocess(frame: np.ndarray) -> tuple[np.ndarray, np.ndarray, Any, Callable | None]:
+            try:
+                slot = free.get_nowait()
+            except queue.Empty:
+                meta = letterbox.fill(ring_size, frame)
+                return frame, letterbox.tensor[ring_size:].copy(), meta, None
+            meta = letterbox.fill(slot, frame)
+            return frame, letterbox.tensor[slot:slot + 1], meta, partial(free.put, slot)
+        return preprocess
+    return factory
+
+
+def _inference(model: Any, device: str, half: bool) -> Callable[[], Callable]:
+    """Darknet forward pass, torch is only imported by the inference worker
+    """
+    def factory():
+        import torch
+
+        model.eval()
+
+        def inference(item: tuple) -> tuple:
+            frame, tensor, meta, release = item
+            x = torch.from_numpy(tensor).to(device)
+            x = x.half() if half else x
+            with torch.no_grad():
+                pred = model(x)[0]
+            pred = pred[0].float().cpu().numpy()
+            # the output no longer depends on the input slot
+            if release is not None:
+                release()
+            return frame, pred, meta
+        return inference
+    return factory
+
+
+def _postprocess(filter_cls: list[int], conf_thres: float, iou_thres: float) -> Callable:
+    def postprocess(item: tuple) -> tuple[np.ndarray, Det]:
+        frame, pred, meta = item
+        return frame, to_det(pred, meta, filter_cls, conf_thres, iou_thres)
+    return postprocess
+
+
+def _track(tracker: Callable[[Det, np.ndarray], np.ndarray] | None) -> Callable:
+    def track(item: tuple) -> tuple[np.ndarray, np.ndarray]:
+        frame, det = item
+        if tracker is not None:
+            return frame, np.asarray(tracker(det, frame), dtype=np.float32).reshape(-1, 7)
+        # untracked rows carry track id -1
+        pred = np.asarray(det.pred, dtype=np.float32).reshape(-1, 6)
+        return frame, np.c_[pred, np.full(len(pred), -1, dtype=np.float32)]
+    return track
+
+
+def _write(writer: WriterInterface, draw: bool) -> Callable[[], Callable]:
+    """Single writer worker, results are keyed by the source frame index starting at 0
+    """
+    def factory():
+        frame_index = 0
+
+        def write(item: tuple) -> np.ndarray:
+            nonlocal frame_index
+            frame, outputs = item
+            writer.save_results(outputs, frame_index)
+            frame_index += 1
+            if draw and len(outputs):
+                ids = np.where(outputs[:, 6] >= 0, outputs[:, 6], outputs[:, 5]).astype(np.int64)
+                writer.draw_detections(frame, outputs[:, :4], ids)
+            writer.write_vid(frame)
+            return outputs
+        return write
+    return factory
+
+
+def build_detection_pipeline(model: Any,
+                             writer: WriterInterface | None = None,
+                             tracker: Callable[[Det, np.ndarray], np.ndarray] | None = None,
+                             img_size: int | tuple[int, int] = 640,
+                             device: str = 'cpu',
+                             half: bool = False,
+                             filter_cls: list[int] = (0,),
+                             conf_thres: float = 0.25,
+                             iou_thres: float = 0.45,
+                             preprocess_workers: int = 2,
+                             postprocess_workers: int = 2,
+                             queue_size: int = 8,
+                             draw: bool = True) -> Pipeline:
+    """Wire letterbox, Darknet, NMS + Det filtering, tracking and writing into a Pipeline.
+    Run it with pipeline.run(reader), every output is a (N, 7) array of
+    x0, y0, x1, y1, conf, cls, track_id rows in source frame coordinates.
+    Args:
+        model (Any): Darknet model on device, see models.import_model.get_darknet
+        writer (WriterInterface | None): draws, writes frames and saves results, None skips the stage
+        tracker (Callable | None): tracker(det, frame) returning rows of x0, y0, x1, y1, conf, cls, track_id
+        img_size (int | tuple[int, int]): model input size as int or (width, height)
+        device (str): torch device of the model
+        half (bool): feed float16 inputs
+        filter_cls (list[int]): classes kept by Det
+        conf_thres (float): NMS confidence threshold
+        iou_thres (float): NMS IoU threshold
+        preprocess_workers (int): letterbox threads
+        postprocess_workers (int): NMS threads
+        queue_size (int): bound of every queue
+        draw (bool): draw detections before writing
+    Returns:
+        Pipeline: the wired pipeline
+    """
+    width, height = (img_size, img_size) if isinstance(img_size, int) else img_size
+    stages = [
+        Stage('preprocess', _preprocess(width, height, queue_size // max(preprocess_workers, 1) + 2),
+              workers=preprocess_workers, per_worker=True),
+        Stage('inference', _inference(model, device, half), per_worker=True),
+        Stage('postprocess', _postprocess(list(filter_cls), conf_thres, iou_thres), workers=postprocess_workers),
+        Stage('track', _track(tracker)),
+    ]
+    if writer is not None:
+        stages.append(Stage('write', _write(writer, draw), per_worker=True))
+    else:
+        stages.append(Stage('output', lambda item: item[1]))
+    return Pipeline(stages, queue_size=queue_size)
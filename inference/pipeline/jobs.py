@@ -0,0 +1,244 @@
+from __future__ import annotations
+import os
+import time
+import multiprocessing as mp
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+
+from inference.opencv import VideoReader, ImageReader
+from inference.results import ResultSink
+from .detection import make_batch_detector
+
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                   'NUMEXPR_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS')
+
+# per worker process state, filled by _init_worker
+_worker_state = {}
+
+
+@dataclass
+class SourceResult:
+    """Outcome of one source
+    """
+    source: str
+    frames: int = 0
+    detections: int = 0
+    seconds: float = 0.0
+    output: str | None = None
+    error: str | None = None
+    pid: int | None = None
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.seconds if self.seconds > 0 else 0.0
+
+
+def configure_threads(num_threads: int) -> None:
+    """Limit intra-op threads of OpenMP/BLAS, OpenCV and torch in the current process
+    Args:
+        num_threads (int): threads per process
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(num_threads)
+    cv2.setNumThreads(num_threads)
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(num_threads)
+
+
+def _init_worker(num_threads: int, model_loader: Callable[[], Any] | None) -> None:
+    """Pool initializer, the model is loaded once per worker and reused for every source
+    """
+    configure_threads(num_threads)
+    _worker_state['model'] = model_loader() if model_loader is not None else None
+
+
+def open_source(source: str, **kwargs) -> VideoReader | ImageReader:
+    """Reader of a video file or an image directory
+    Args:
+        source (str): video file or image directory
+    Returns:
+        VideoReader | ImageReader: opened reader
+    """
+    if os.path.isdir(source):
+        return ImageReader(source, **kwargs)
+    return VideoReader(source, **kwargs)
+
+
+def process_source(source: str, model: Any,
+                   output_dir: str | None = None,
+                   batch_size: int = 8,
+                   **detector_kwargs) -> dict:
+    """Default job, batched detection of every frame of a source
+    Args:
+        source (str): video file or image directory
+        model (Any): model loaded by the worker's model_loader
+        output_dir (str | None): if set, results are saved to <output_dir>/<name>_result.bin
+        batch_size (int): frames per forward pass
+        **detector_kwargs: passed to make_batch_detector
+    Returns:
+        dict: frames, detections and output path
+    """
+    detect = make_batch_detector(model, batch_size, **detector_kwargs)
+    reader = open_source(source)
+    sink = None
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        base_name = os.path.basename(source.rstrip('/')).split('.')[0]
+        sink = ResultSink(os.path.join(output_dir, f'{base_name}_result.bin'), fmt='bin')
+
+    frames, detections, batch = 0, 0, []
+
+    def flush() -> int:
+        count = 0
+        for index, det in enumerate(detect(batch), frames - len(batch)):
+            pred = np.asarray(det.pred, dtype=np.float32).reshape(-1, 6)
+            count += len(pred)
+            if sink is not None:
+                sink.write(index, pred)
+        batch.clear()
+        return count
+
+    try:
+        for frame in reader:
+            if frame is None:
+                break
+            batch.append(frame)
+            frames += 1
+            if len(batch) == batch_size:
+                detections += flush()
+        if batch:
+            detections += flush()
+    finally:
+        reader.release()
+        if sink is not None:
+            sink.close()
+    return {"frames": frames, "detections": detections, "output": None if sink is None else sink.path}
+
+
+def _run_job(job: tuple[str, Callable, dict]) -> SourceResult:
+    """Run one source on a worker, errors are reported instead of stopping the pool
+    """
+    source, process_fn, kwargs = job
+    result = SourceResult(source, pid=os.getpid())
+    start = time.perf_counter()
+    try:
+        outcome = process_fn(source, _worker_state.get('model'), **kwargs)
+        outcome = dict(outcome or {})
+        result.frames = outcome.pop('frames', 0)
+        result.detections = outcome.pop('detections', 0)
+        result.output = outcome.pop('output', None)
+        result.extra = outcome
+    except Exception as error:
+        result.error = f'{type(error).__name__}: {error}'
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+class JobRunner:
+    """
+    Shards a list of sources (video files or image directories) over a process pool.
+    Every worker limits its intra-op threads to threads_per_worker, so processes * threads
+    matches the cores instead of every process spawning one thread per core, and loads the
+    model once through model_loader.
+    """
+    def __init__(self,
+                 model_loader: Callable[[], Any] | None = None,
+                 process_fn: Callable[..., dict] = process_source,
+                 processes: int | None = None,
+                 threads_per_worker: int | None = None,
+                 start_method: str = 'spawn',
+                 **process_kwargs) -> None:
+        """Initiate JobRunner object
+        Args:
+            model_loader (Callable | None): picklable function returning the model,
+                e.g. functools.partial(get_darknet, cfg, img_size, device, weight_path)
+            process_fn (Callable): process_fn(source, model, **process_kwargs) returning a dict
+                with optional frames, detections and output keys
+            processes (int | None): worker processes, defaults to the number of cores
+            threads_per_worker (int | None): intra-op threads per worker, defaults to cores divided by
+                the actual pool size, which shrinks to the number of sources
+            start_method (str): multiprocessing start method, spawn is safe with CUDA and threads
+            **process_kwargs: passed to process_fn
+        """
+        if model_loader is None and process_fn is process_source:
+            raise AssertionError("process_source needs a model, provide model_loader.")
+        self._model_loader = model_loader
+        self._process_fn = process_fn
+        self._processes = processes or os.cpu_count() or 1
+        self._threads_per_worker = threads_per_worker
+        self._start_method = start_method
+        self._process_kwargs = process_kwargs
+
+    @property
+    def processes(self) -> int:
+        return self._processes
+
+    def threads_per_worker(self, processes: int) -> int:
+        """Intra-op threads of each worker for a pool size
+        Args:
+            processes (int): worker processes actually started
+        Returns:
+            int: threads per worker
+        """
+        if self._threads_per_worker is not None:
+            return self._threads_per_worker
+        return max(1, (os.cpu_count() or 1) // processes)
+
+    def run(self, sources: list[str], callback: Callable[[SourceResult], None] | None = None) -> dict:
+        """Process every source
+        Args:
+            sources (list[str]): video files or image directories
+            callback (Callable | None): called with each SourceResult as it completes
+        Returns:
+            dict: results in source order, total frames and detections, wall seconds, fps, failed sources
+            and the pool layout
+        """
+        jobs = [(source, self._process_fn, self._process_kwargs) for source in sources]
+        processes = max(1, min(self._processes, len(jobs)))
+        threads = self.threads_per_worker(processes)
+
+        # spawned workers inherit the environment, set before any BLAS library is loaded there
+        saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+        for name in THREAD_ENV_VARS:
+            os.environ[name] = str(threads)
+
+        start = time.perf_counter()
+        results = {}
+        try:
+            with ProcessPoolExecutor(max_workers=processes, mp_context=mp.get_context(self._start_method),
+                                     initializer=_init_worker,
+                                     initargs=(threads, self._model_loader)) as executor:
+                futures = {executor.submit(_run_job, job): i for i, job in enumerate(jobs)}
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[futures[future]] = result
+                    if callback is not None:
+                        callback(result)
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+        seconds = time.perf_counter() - start
+
+        ordered = [results[i] for i in range(len(jobs))]
+        frames = sum(result.frames for result in ordered)
+        return {
+            "sources": ordered,
+            "frames": frames,
+            "detections": sum(result.detections for result in ordered),
+            "seconds": seconds,
+            "fps": frames / seconds if seconds > 0 else 0.0,
+            "failed": [result.source for result in ordered if result.error is not None],
+            "processes": processes,
+            "threads_per_worker": threads,
+        }
@@ -0,0 +1,202 @@
+from __future__ import annotations
+import time
+import queue
+import threading
+from typing import Any, Iterable, Iterator
+
+from .stage import Stage, StageStats
+
+# end of stream marker passed through every queue
+_END = object()
+
+
+class Pipeline:
+    """
+    Stages connected by bounded queues, each stage running on its own worker threads.
+    A slow stage fills its input queue and blocks the stages before it, so throughput
+    settles at the rate of the slowest stage while every other stage overlaps with it.
+    The first exception raised by any stage stops every thread and is re-raised by run.
+    """
+    def __init__(self, stages: list[Stage], queue_size: int = 8, poll_interval: float = 0.1) -> None:
+        """Initiate Pipeline object
+        Args:
+            stages (list[Stage]): stages in processing order
+            queue_size (int): default bound of every queue
+            poll_interval (float): seconds between checks for a stopped pipeline while blocked
+        """
+        if not stages:
+            raise AssertionError("Pipeline needs at least one stage.")
+        self._stages = stages
+        self._queue_size = queue_size
+        self._poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._error = None
+        self._threads = []
+
+    @property
+    def stages(self) -> list[Stage]:
+        return self._stages
+
+    @property
+    def stats(self) -> list[StageStats]:
+        """Throughput counters of every stage
+        Returns:
+            list[StageStats]: stats in stage order
+        """
+        return [stage.stats for stage in self._stages]
+
+    def report(self) -> str:
+        """Human readable per-stage throughput
+        Returns:
+            str: one line per stage
+        """
+        return '\n'.join(str(stats) for stats in self.stats)
+
+    def _fail(self, error: BaseException) -> None:
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        """Blocking put that gives up once the pipeline is stopped
+        """
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=self._poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        """Blocking get that returns _END once the pipeline is stopped
+        """
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=self._poll_interval)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _feed(self, source: Iterable, out_q: queue.Queue) -> None:
+        """Number the source items and push them into the first queue
+        """
+        try:
+            for seq, item in enumerate(source):
+                if not self._put(out_q, (seq, item)):
+                    return
+            self._put(out_q, _END)
+        except BaseException as error:
+            self._fail(error)
+
+    def _emit(self, stage: Stage, out_q: queue.Queue, seq: int, result: Any) -> bool:
+        """Forward a result, through the reorder buffer for multi-worker stages
+        """
+        if stage.workers == 1:
+            return self._put(out_q, (seq, result))
+        with stage._lock:
+            stage._reorder[seq] = result
+            while stage._next_seq in stage._reorder:
+                ready = stage._reorder.pop(stage._next_seq)
+                if not self._put(out_q, (stage._next_seq, ready)):
+                    return False
+                stage._next_seq += 1
+        return True
+
+    def _work(self, stage: Stage, in_q: queue.Queue, out_q: queue.Queue) -> None:
+        """Worker loop of one stage thread
+        """
+        try:
+            fn = stage.build()
+            stats = stage.stats
+            while True:
+                item = self._get(in_q)
+                if item is _END:
+                    with stage._lock:
+                        stage._ended += 1
+                        last = stage._ended == stage.workers
+                    if self._stop.is_set():
+                        return
+                    if last:
+                        stats.finished = time.perf_counter()
+                        self._put(out_q, _END)
+                    else:
+                        # hand the marker on to the sibling workers
+                        self._put(in_q, _END)
+                    return
+
+                seq, value = item
+                if stats.started is None:
+                    stats.started = time.perf_counter()
+                start = time.perf_counter()
+                result = fn(value)
+                elapsed = time.perf_counter() - start
+                with stage._lock:
+                    stats.items += 1
+                    stats.busy += elapsed
+                if not self._emit(stage, out_q, seq, result):
+                    return
+        except BaseException as error:
+            self._fail(error)
+
+    def _start(self, source: Iterable) -> queue.Queue:
+        """Create the queues and start every thread
+        Returns:
+            queue.Queue: queue of the last stage's outputs
+        """
+        self._stop.clear()
+        self._error = None
+        queues = [queue.Queue(self._queue_size if stage.queue_size is None else stage.queue_size)
+                  for stage in self._stages]
+        queues.append(queue.Queue(self._queue_size))
+
+        self._threads = [threading.Thread(target=self._feed, args=(source, queues[0]),
+                                          name='Pipeline-source', daemon=True)]
+        for stage, in_q, out_q in zip(self._stages, queues[:-1], queues[1:]):
+            stage.reset()
+            for i in range(stage.workers):
+                self._threads.append(threading.Thread(target=self._work, args=(stage, in_q, out_q),
+                                                      name=f'Pipeline-{stage.name}-{i}', daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return queues[-1]
+
+    def _join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def run(self, source: Iterable) -> Iterator[Any]:
+        """Process every item of source, yielding the last stage's outputs in source order
+        Args:
+            source (Iterable): e.g. a ReaderInterface
+        Raises:
+            Exception: first error raised by the source or any stage
+        Returns:
+            Iterator[Any]: outputs of the last stage
+        """
+        out_q = self._start(source)
+        try:
+            while True:
+                item = self._get(out_q)
+                if item is _END:
+                    break
+                yield item[1]
+        finally:
+            # stops the threads when the consumer leaves early
+            self._stop.set()
+            self._join()
+        if self._error is not None:
+            raise self._error
+
+    def process(self, source: Iterable) -> int:
+        """Run the pipeline to the end, discarding outputs
+        Args:
+            source (Iterable): e.g. a ReaderInterface
+        Returns:
+            int: number of items that went through every stage
+        """
+        count = 0
+        for _ in self.run(source):
+            count += 1
+        return count
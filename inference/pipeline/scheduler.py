@@ -0,0 +1,257 @@
+from __future__ import annotations
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable
+
+
+class LatencyModel:
+    """
+    Online fit of batch latency as base + per_item * batch_size.
+    Sums are exponentially decayed so the fit follows changes in load, clocks or input size.
+    """
+    def __init__(self, base: float = 0.01, per_item: float = 0.005, decay: float = 0.95) -> None:
+        """Initiate LatencyModel object
+        Args:
+            base (float): initial fixed cost of one batch in seconds
+            per_item (float): initial cost of every frame in a batch in seconds
+            decay (float): weight kept by past samples on every update
+        """
+        self._base = base
+        self._per_item = per_item
+        self._decay = decay
+        self._n = self._sx = self._sy = self._sxx = self._sxy = 0.0
+
+    @property
+    def base(self) -> float:
+        return self._base
+
+    @property
+    def per_item(self) -> float:
+        return self._per_item
+
+    def update(self, batch_size: int, seconds: float) -> None:
+        """Add one measured batch
+        Args:
+            batch_size (int): frames in the batch
+            seconds (float): measured latency
+        """
+        d = self._decay
+        self._n = self._n * d + 1
+        self._sx = self._sx * d + batch_size
+        self._sy = self._sy * d + seconds
+        self._sxx = self._sxx * d + batch_size * batch_size
+        self._sxy = self._sxy * d + batch_size * seconds
+
+        mean_x, mean_y = self._sx / self._n, self._sy / self._n
+        var_x = self._sxx / self._n - mean_x * mean_x
+        if var_x > 1e-6:
+            per_item = (self._sxy / self._n - mean_x * mean_y) / var_x
+            self._per_item = max(per_item, 0.0)
+            self._base = max(mean_y - self._per_item * mean_x, 0.0)
+        else:
+            # one batch size seen so far, keep the slope and move the intercept
+            self._base = max(mean_y - self._per_item * mean_x, 0.0)
+
+    def predict(self, batch_size: int) -> float:
+        """Expected latency of a batch
+        Args:
+            batch_size (int): frames in the batch
+        Returns:
+            float: seconds
+        """
+        return self._base + self._per_item * batch_size
+
+    def max_batch_size(self, budget: float, limit: int) -> int:
+        """Largest batch expected to finish within budget
+        Args:
+            budget (float): seconds available
+            limit (int): upper bound of the batch size
+        Returns:
+            int: batch size in [1, limit]
+        """
+        if self._per_item <= 0:
+            return limit
+        return int(min(max((budget - self._base) / self._per_item, 1), limit))
+
+
+class _Request:
+    __slots__ = ('item', 'deadline', 'future', 'arrival')
+
+    def __init__(self, item: Any, deadline: float | None, future: Future, arrival: float):
+        self.item = item
+        self.deadline = deadline
+        self.future = future
+        self.arrival = arrival
+
+
+class BatchScheduler:
+    """
+    Dynamic batching in front of a batch function such as a Darknet forward pass.
+    Frames submitted by any number of producer threads are grouped into one call of fn,
+    which is dispatched when max_batch_size frames are waiting, the oldest frame waited
+    max_wait seconds, or the earliest deadline would otherwise be missed. The batch size is
+    capped by a LatencyModel fitted to measured fn latencies, and results go back to each
+    caller through the Future returned by submit.
+    """
+    def __init__(self,
+                 fn: Callable[[list[Any]], list[Any]],
+                 max_batch_size: int = 8,
+                 max_wait: float = 0.01,
+                 latency_model: LatencyModel | None = None,
+                 name: str = 'BatchScheduler') -> None:
+        """Initiate BatchScheduler object
+        Args:
+            fn (Callable): maps a list of items to a list of results of the same length
+            max_batch_size (int): maximum items per call
+            max_wait (float): seconds the oldest item may wait for a fuller batch
+            latency_model (LatencyModel | None): latency estimate, fitted online
+            name (str): name of the dispatch thread
+        """
+        if max_batch_size < 1:
+            raise AssertionError("max_batch_size must be at least 1.")
+        self._fn = fn
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._latency = LatencyModel() if latency_model is None else latency_model
+
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._batches = 0
+        self._items = 0
+        self._late = 0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def latency_model(self) -> LatencyModel:
+        return self._latency
+
+    @property
+    def info(self) -> dict:
+        """Dispatch counters
+        Returns:
+            dict: batches, items, mean_batch_size, late items and fitted latency
+        """
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+            "late": self._late,
+            "base_latency": self._latency.base,
+            "per_item_latency": self._latency.per_item,
+        }
+
+    def submit(self, item: Any, deadline: float | None = None) -> Future:
+        """Queue one item
+        Args:
+            item (Any): e.g. a BGR frame
+            deadline (float | None): seconds from now the result is wanted in, None waits at most max_wait
+        Raises:
+            Exception: raised when the scheduler is closed
+        Returns:
+            Future: resolves to fn's result for this item
+        """
+        now = time.perf_counter()
+        future = Future()
+        request = _Request(item, None if deadline is None else now + deadline, future, now)
+        with self._condition:
+            if self._closed:
+                raise Exception("Attempted submitting to a closed BatchScheduler.")
+            self._pending.append(request)
+            self._condition.notify()
+        return future
+
+    def _dispatch_time(self) -> float:
+        """Time the waiting batch has to be sent at
+        """
+        size = min(len(self._pending), self._max_batch_size)
+        dispatch = self._pending[0].arrival + self._max_wait
+        deadlines = [r.deadline for r in self._pending if r.deadline is not None]
+        if deadlines:
+            dispatch = min(dispatch, min(deadlines) - self._latency.predict(size))
+        return dispatch
+
+    def _next_batch(self) -> list[_Request] | None:
+        """Wait for a batch worth dispatching
+        """
+        with self._condition:
+            while True:
+                if not self._pending:
+                    if self._closed:
+                        return None
+                    self._condition.wait()
+                    continue
+                now = time.perf_counter()
+                if self._closed or len(self._pending) >= self._max_batch_size:
+                    break
+                timeout = self._dispatch_time() - now
+                if timeout <= 0:
+                    break
+                self._condition.wait(timeout)
+
+            size = min(len(self._pending), self._max_batch_size)
+            deadlines = [r.deadline for r in list(self._pending)[:size] if r.deadline is not None]
+            if deadlines:
+                budget = min(deadlines) - now
+                # once even a single frame would be late, shrinking only lowers throughput
+                if budget >= self._latency.predict(1):
+                    size = self._latency.max_batch_size(budget, size)
+            return [self._pending.popleft() for _ in range(size)]
+
+    def _run(self) -> None:
+        """Dispatch loop
+        """
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                results = self._fn([r.item for r in batch])
+                if len(results) != len(batch):
+                    raise Exception(f"Batch function returned {len(results)} results for {len(batch)} items.")
+            except BaseException as error:
+                for request in batch:
+                    request.future.set_exception(error)
+                continue
+            end = time.perf_counter()
+
+            self._latency.update(len(batch), end - start)
+            self._batches += 1
+            self._items += len(batch)
+            for request, result in zip(batch, results):
+                if request.deadline is not None and end > request.deadline:
+                    self._late += 1
+                request.future.set_result(result)
+
+    def close(self) -> None:
+        """Dispatch what is still queued and stop the scheduler
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def __enter__(self) -> "BatchScheduler":
+        """Returns Conext for "with" block usage
+        Returns:
+            BatchScheduler: BatchScheduler object
+        """
+        return self
+
+    def __exit__(self, exc_type: None, exc_value: None, traceback: None) -> None:
+        """Dispatch remaining items before exiting the "with" block
+        Args:
+            exc_type (NoneType): Exception type if any
+            exc_value (NoneType): Exception value if any
+            traceback (NoneType): Traceback of Exception
+        """
+        self.close()
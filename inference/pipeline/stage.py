@@ -0,0 +1,122 @@
+from __future__ import annotations
+import time
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class StageStats:
+    """Throughput counters of one stage
+    """
+    name: str
+    workers: int
+    items: int = 0
+    busy: float = 0.0
+    started: float | None = None
+    finished: float | None = None
+
+    @property
+    def wall(self) -> float:
+        """Seconds from the first item to end of stream (or now)
+        Returns:
+            float: wall time of the stage
+        """
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Items per second over the stage's wall time
+        Returns:
+            float: items per second
+        """
+        wall = self.wall
+        return self.items / wall if wall > 0 else 0.0
+
+    @property
+    def capacity(self) -> float:
+        """Items per second the stage could sustain if it never waited on its queues
+        Returns:
+            float: items per second
+        """
+        return self.items * self.workers / self.busy if self.busy > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Share of the workers' time spent processing, the bottleneck stage is close to 1
+        Returns:
+            float: utilization in [0, 1]
+        """
+        wall = self.wall
+        return self.busy / (wall * self.workers) if wall > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f'{self.name}: {self.items} items, {self.throughput:.1f} items/s, '
+                f'capacity {self.capacity:.1f} items/s, {self.utilization:.0%} busy x{self.workers}')
+
+
+class Stage:
+    """
+    One step of a Pipeline, fn is applied to every item by `workers` threads.
+    Outputs of multi-worker stages are put back in input order by a reorder buffer,
+    so stateful stages (tracker, writer) downstream still see frames in sequence.
+    """
+    def __init__(self,
+                 name: str,
+                 fn: Callable[[Any], Any],
+                 workers: int = 1,
+                 queue_size: int | None = None,
+                 per_worker: bool = False) -> None:
+        """Initiate Stage object
+        Args:
+            name (str): name used in stats
+            fn (Callable): function applied to each item
+            workers (int): number of worker threads
+            queue_size (int | None): bound of the stage's input queue, defaults to the pipeline's
+            per_worker (bool): fn is a factory called once per worker thread to build the actual
+                function, for per-worker state such as preallocated buffers
+        """
+        if workers < 1:
+            raise AssertionError("Stage needs at least one worker.")
+        self._name = name
+        self._fn = fn
+        self._workers = workers
+        self._queue_size = queue_size
+        self._per_worker = per_worker
+
+        self._lock = threading.Lock()
+        self._stats = StageStats(name, workers)
+        self._reorder = {}
+        self._next_seq = 0
+        self._ended = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def queue_size(self) -> int | None:
+        return self._queue_size
+
+    @property
+    def stats(self) -> StageStats:
+        return self._stats
+
+    def reset(self) -> None:
+        """Clear counters and ordering state before a new run
+        """
+        self._stats = StageStats(self._name, self._workers)
+        self._reorder = {}
+        self._next_seq = 0
+        self._ended = 0
+
+    def build(self) -> Callable[[Any], Any]:
+        """Function used by one worker thread
+        """
+        return self._fn() if self._per_worker else self._fn
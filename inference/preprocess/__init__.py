@@ -0,0 +1 @@
+from .letterbox import Letterbox, LetterboxMeta, scale_boxes
@@ -0,0 +1,166 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class LetterboxMeta:
+    """Mapping between a source frame and its letterboxed slot
+    """
+    scale: float
+    pad: tuple[int, int]
+    shape: tuple[int, int]
+
+    def to_source(self, boxes: np.ndarray) -> np.ndarray:
+        """Map xyxy boxes from model input space back to the source frame
+        Args:
+            boxes (np.ndarray): (N, >=4) boxes in model input coordinates
+        Returns:
+            np.ndarray: copy of boxes in source frame coordinates
+        """
+        return scale_boxes(boxes, self)
+
+
+def scale_boxes(boxes: np.ndarray, meta: LetterboxMeta) -> np.ndarray:
+    """Undo letterbox padding and scaling for xyxy boxes
+    Args:
+        boxes (np.ndarray): (N, >=4) boxes, only the first four columns are mapped
+        meta (LetterboxMeta): metadata recorded when the frame was letterboxed
+    Returns:
+        np.ndarray: copy of boxes clipped to the source frame
+    """
+    boxes = np.array(boxes, dtype=np.float32, copy=True)
+    if boxes.size == 0:
+        return boxes
+    height, width = meta.shape
+    boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - meta.pad[0]) / meta.scale).clip(0, width)
+    boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - meta.pad[1]) / meta.scale).clip(0, height)
+    return boxes
+
+
+class Letterbox:
+    """
+    Letterbox BGR frames straight into a reusable (B, 3, H, W) model input tensor.
+    Resize is done by OpenCV into a cached scratch buffer, then BGR->RGB, HWC->CHW,
+    float conversion and /255 are applied by a single ufunc pass into the slot.
+    """
+    def __init__(self,
+                 batch_size: int = 1,
+                 width: int = 640,
+                 height: int = 640,
+                 pad_value: int = 114,
+                 scaleup: bool = True,
+                 dtype: np.dtype = np.float32,
+                 interpolation: int = cv2.INTER_LINEAR) -> None:
+        """Initiate Letterbox object
+        Args:
+            batch_size (int): number of slots in the input tensor
+            width (int): model input width
+            height (int): model input height
+            pad_value (int): pixel value (0-255) used for the border
+            scaleup (bool): if False, frames smaller than the input are not upscaled
+            dtype (np.dtype): dtype of the input tensor
+            interpolation (int): cv2 interpolation flag used for resizing
+        """
+        self._batch_size = batch_size
+        self._width = width
+        self._height = height
+        self._pad_value = pad_value / 255.0
+        self._scaleup = scaleup
+        self._interpolation = interpolation
+
+        self._tensor = np.full((batch_size, 3, height, width), self._pad_value, dtype=dtype)
+        self._scratch = {}
+        self._layouts = [None] * batch_size
+        self._metas = [None] * batch_size
+
+    @property
+    def tensor(self) -> np.ndarray:
+        """Preallocated model input, use torch.from_numpy for a zero-copy tensor
+        Returns:
+            np.ndarray: (B, 3, H, W) input tensor
+        """
+        return self._tensor
+
+    @property
+    def batch_size(self) -> int:
+        """Number of slots
+        Returns:
+            int: batch size of the input tensor
+        """
+        return self._batch_size
+
+    @property
+    def metas(self) -> list[LetterboxMeta | None]:
+        """Metadata of the frames currently held by each slot
+        Returns:
+            list[LetterboxMeta | None]: metadata per slot
+        """
+        return self._metas
+
+    def _layout(self, shape: tuple[int, int]) -> tuple[float, int, int, int, int]:
+        """Scale, resized size and padding for a source shape
+        """
+        height, width = shape
+        scale = min(self._height / height, self._width / width)
+        if not self._scaleup:
+            scale = min(scale, 1.0)
+        new_w, new_h = int(round(width * scale)), int(round(height * scale))
+        left = (self._width - new_w) // 2
+        top = (self._height - new_h) // 2
+        return scale, new_w, new_h, left, top
+
+    def _resize(self, frame: np.ndarray, new_w: int, new_h: int) -> np.ndarray:
+        """Resize into a cached scratch buffer
+        """
+        if frame.shape[:2] == (new_h, new_w):
+            return frame
+        scratch = self._scratch.get((new_h, new_w))
+        if scratch is None:
+            scratch = np.empty((new_h, new_w, 3), dtype=np.uint8)
+            self._scratch[(new_h, new_w)] = scratch
+        cv2.resize(frame, (new_w, new_h), dst=scratch, interpolation=self._interpolation)
+        return scratch
+
+    def fill(self, index: int, frame: np.ndarray) -> LetterboxMeta:
+        """Letterbox one BGR frame into a slot of the input tensor
+        Args:
+            index (int): slot index
+            frame (np.ndarray): HWC BGR uint8 frame
+        Returns:
+            LetterboxMeta: scale and padding applied to the frame
+        """
+        shape = frame.shape[:2]
+        scale, new_w, new_h, left, top = self._layout(shape)
+        slot = self._tensor[index]
+
+        # the border only has to be repainted when the slot layout changes
+        layout = (new_w, new_h, left, top)
+        if self._layouts[index] != layout:
+            slot.fill(self._pad_value)
+            self._layouts[index] = layout
+
+        resized = self._resize(frame, new_w, new_h)
+        np.multiply(resized[:, :, ::-1].transpose(2, 0, 1), 1 / 255.0,
+                    out=slot[:, top:top + new_h, left:left + new_w], casting='unsafe')
+
+        meta = LetterboxMeta(scale, (left, top), shape)
+        self._metas[index] = meta
+        return meta
+
+    def __call__(self, frames: np.ndarray | list[np.ndarray]) -> tuple[np.ndarray, list[LetterboxMeta]]:
+        """Letterbox a frame or a batch of frames
+        Args:
+            frames (np.ndarray | list[np.ndarray]): HWC frame, BHWC batch or list of frames
+        Returns:
+            tuple[np.ndarray, list[LetterboxMeta]]: view on the filled slots and their metadata
+        """
+        if isinstance(frames, np.ndarray) and frames.ndim == 3:
+            frames = [frames]
+        if len(frames) > self._batch_size:
+            raise Exception(f"Got {len(frames)} frames for a batch size of {self._batch_size}.")
+
+        metas = [self.fill(i, frame) for i, frame in enumerate(frames)]
+        return self._tensor[:len(metas)], metas
@@ -0,0 +1,2 @@
+from .sink import ResultSink, ResultReader, RECORD_DTYPE
+from .store import ResultStore
@@ -0,0 +1,221 @@
+from __future__ import annotations
+import os
+import json
+
+import numpy as np
+
+# one row per box of the binary format, see ResultSink.to_records
+RECORD_DTYPE = np.dtype([
+    ("frame", "<i8"),
+    ("track_id", "<i8"),
+    ("xyxy", "<f4", (4,)),
+    ("conf", "<f4"),
+    ("cls", "<i4"),
+])
+_INDEX_DTYPE = np.dtype([("frame", "<i8"), ("offset", "<i8")])
+
+
+def _to_builtin(value):
+    """json.dumps fallback for numpy values
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ResultSink:
+    """
+    Append-only per-frame results file.
+    jsonl writes one {"frame": n, "data": [...]} line per frame, bin writes RECORD_DTYPE rows.
+    Both keep a side index of (frame, offset) pairs for random access by frame.
+    """
+    _FORMATS = {"jsonl", "bin"}
+
+    def __init__(self,
+                 path: str,
+                 fmt: str = "jsonl",
+                 flush_every: int = 100,
+                 buffer_size: int = 1 << 20) -> None:
+        """Initiate ResultSink object
+        Args:
+            path (str): output file, the index is written next to it as path + ".idx"
+            fmt (str): jsonl or bin
+            flush_every (int): frames between explicit flushes
+            buffer_size (int): write buffer in bytes
+        """
+        if fmt not in self._FORMATS:
+            raise Exception(f"Unsupported result format {fmt}, use one of {sorted(self._FORMATS)}.")
+
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        self._path = path
+        self._fmt = fmt
+        self._flush_every = max(1, flush_every)
+        self._file = open(path, "wb", buffering=buffer_size)
+        self._index_file = open(path + ".idx", "wb", buffering=buffer_size)
+        self._offset = 0
+        self._frames = 0
+
+    @property
+    def path(self) -> str:
+        """Results file
+        Returns:
+            str: path of the results file
+        """
+        return self._path
+
+    @property
+    def frame_count(self) -> int:
+        """Frames written
+        Returns:
+            int: written frames' count
+        """
+        return self._frames
+
+    @staticmethod
+    def to_records(frame: int, outputs: np.ndarray | list[list[float]]) -> np.ndarray:
+        """Rows of [x0, y0, x1, y1, conf, cls(, track_id)] to RECORD_DTYPE
+        Args:
+            frame (int): frame index
+            outputs (np.ndarray | list): (N, 6) detections or (N, 7) tracks
+        Returns:
+            np.ndarray: (N,) structured records
+        """
+        outputs = np.asarray(outputs, dtype=np.float64)
+        outputs = outputs.reshape(-1, outputs.shape[-1] if outputs.size else 6)
+        records = np.zeros(len(outputs), dtype=RECORD_DTYPE)
+        records["frame"] = frame
+        records["xyxy"] = outputs[:, 0:4]
+        records["conf"] = outputs[:, 4]
+        records["cls"] = outputs[:, 5]
+        records["track_id"] = outputs[:, 6] if outputs.shape[1] > 6 else -1
+        return records
+
+    def write(self, frame: int, outputs: list[dict] | np.ndarray) -> None:
+        """Append results of one frame
+        Args:
+            frame (int): frame index
+            outputs (list[dict] | np.ndarray): dicts (jsonl only) or rows of
+            [x0, y0, x1, y1, conf, cls(, track_id)]
+        """
+        if self._fmt == "jsonl":
+            if isinstance(outputs, np.ndarray):
+                outputs = outputs.tolist()
+            data = (json.dumps({"frame": frame, "data": outputs}, default=_to_builtin) + "\n").encode()
+            size = len(data)
+        else:
+            data = self.to_records(frame, outputs)
+            size = data.nbytes
+
+        self._index_file.write(np.array((frame, self._offset), dtype=_INDEX_DTYPE).tobytes())
+        self._file.write(data)
+        self._offset += size
+        self._frames += 1
+
+        if self._frames % self._flush_every == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        """Flush buffered results to the OS
+        """
+        if self._file is not None:
+            self._file.flush()
+            self._index_file.flush()
+
+    def close(self) -> None:
+        """Flush and close files
+        """
+        if self._file is not None:
+            self._file.close()
+            self._index_file.close()
+            self._file = None
+            self._index_file = None
+
+    def __del__(self) -> None:
+        """Release Resources
+        """
+        self.close()
+
+    def __enter__(self) -> "ResultSink":
+        """Returns Conext for "with" block usage
+        Returns:
+            ResultSink: sink object
+        """
+        return self
+
+    def __exit__(self, exc_type: None, exc_value: None,
+                 traceback: None) -> None:
+        """Close files before exiting the "with" block
+        Args:
+            exc_type (NoneType): Exception type if any
+            exc_value (NoneType): Exception value if any
+            traceback (NoneType): Traceback of Exception
+        """
+        self.close()
+
+
+class ResultReader:
+    """
+    Random access by frame into a file written by ResultSink.
+    """
+    def __init__(self, path: str) -> None:
+        """Initiate ResultReader object
+        Args:
+            path (str): results file written by ResultSink
+        """
+        self._path = path
+        self._fmt = "jsonl" if path.endswith(".jsonl") else "bin"
+        self._index = np.fromfile(path + ".idx", dtype=_INDEX_DTYPE)
+        self._size = os.path.getsize(path)
+        self._records = np.memmap(path, dtype=RECORD_DTYPE, mode="r") \
+            if self._fmt == "bin" and self._size else None
+
+    @property
+    def frames(self) -> np.ndarray:
+        """Frame indices in write order
+        Returns:
+            np.ndarray: frames with results
+        """
+        return self._index["frame"]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _span(self, position: int) -> tuple[int, int]:
+        """Byte range of the n-th written frame
+        """
+        start = int(self._index["offset"][position])
+        end = int(self._index["offset"][position + 1]) if position + 1 < len(self._index) else self._size
+        return start, end
+
+    def _position(self, frame: int) -> int:
+        """Position of a frame in the index
+        """
+        frames = self._index["frame"]
+        position = int(np.searchsorted(frames, frame))
+        if position >= len(frames) or frames[position] != frame:
+            # fall back to a scan when frames were not written in order
+            matches = np.flatnonzero(frames == frame)
+            if len(matches) == 0:
+                raise KeyError(frame)
+            position = int(matches[0])
+        return position
+
+    def __getitem__(self, frame: int) -> list[dict] | np.ndarray:
+        """Results of a frame
+        Args:
+            frame (int): frame index
+        Returns:
+            list[dict] | np.ndarray: decoded json data or RECORD_DTYPE rows
+        """
+        start, end = self._span(self._position(frame))
+        if self._fmt == "bin":
+            itemsize = RECORD_DTYPE.itemsize
+            return self._records[start // itemsize:end // itemsize]
+        with open(self._path, "rb") as f:
+            f.seek(start)
+            return json.loads(f.read(end - start))["data"]
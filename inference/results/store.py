@@ -0,0 +1,279 @@
+from __future__ import annotations
+import os
+import json
+import shutil
+
+import numpy as np
+
+from .sink import RECORD_DTYPE, ResultSink
+
+COLUMNS = ("frame", "track_id", "xyxy", "conf", "cls")
+
+
+class ResultStore:
+    """
+    Chunked columnar results store.
+    Every chunk keeps one .npy file per column plus a track-id index (rows grouped by id),
+    the store keeps frame ranges per chunk and which chunks contain which track ids.
+    Reads are memory-mapped, frames are expected to be appended in non-decreasing order.
+    """
+    def __init__(self, path: str, mode: str = "r", chunk_size: int = 1 << 20) -> None:
+        """Initiate ResultStore object
+        Args:
+            path (str): store directory
+            mode (str): r to query, a to append (creates the store if needed),
+            w to replace an existing store with an empty one
+            chunk_size (int): rows buffered before a chunk is written
+        """
+        if mode not in ("r", "a", "w"):
+            raise Exception(f"Unsupported mode {mode}, use r, a or w.")
+
+        self._path = path
+        self._mode = mode
+        self._chunk_size = chunk_size
+        self._buffer = []
+        self._buffered_rows = 0
+        self._chunks = []
+        self._columns = {}
+        self._track_chunks = np.zeros((0, 2), dtype=np.int64)
+
+        meta_file = os.path.join(path, "meta.json")
+        if mode == "w" and os.path.exists(meta_file):
+            shutil.rmtree(path)
+
+        if os.path.exists(meta_file):
+            with open(meta_file) as f:
+                meta = json.load(f)
+            self._chunk_size = meta.get("chunk_size", chunk_size) if mode == "r" else chunk_size
+            self._chunks = meta["chunks"]
+            self._load_track_chunks()
+        elif mode == "r":
+            raise FileNotFoundError(meta_file)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._write_meta()
+
+        self._update_ranges()
+        self._last_frame = self._chunks[-1]["last_frame"] if self._chunks else None
+
+    def _update_ranges(self) -> None:
+        """Frame range per chunk for binary search
+        """
+        self._first_frames = np.array([c["first_frame"] for c in self._chunks], dtype=np.int64)
+        self._last_frames = np.array([c["last_frame"] for c in self._chunks], dtype=np.int64)
+
+    def _load_track_chunks(self) -> None:
+        """Load the (track_id, chunk) pairs, rebuilt from the chunks if missing
+        """
+        index_file = os.path.join(self._path, "track_chunks.npy")
+        if os.path.exists(index_file):
+            # pairs are saved before meta.json, drop chunks meta.json does not know about
+            pairs = np.load(index_file)
+            self._track_chunks = pairs[pairs[:, 1] < len(self._chunks)]
+            return
+
+        pairs = []
+        for chunk in range(len(self._chunks)):
+            keys = np.asarray(self._chunk_column(chunk, "track_keys"))
+            pairs.append(np.stack([keys, np.full(len(keys), chunk)], axis=1))
+        self._track_chunks = self._sort_pairs(np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.int64))
+
+    @staticmethod
+    def _sort_pairs(pairs: np.ndarray) -> np.ndarray:
+        """Sort (track_id, chunk) pairs by id then chunk
+        """
+        pairs = pairs.astype(np.int64).reshape(-1, 2)
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def _write_meta(self) -> None:
+        """Persist chunk list and track index
+        """
+        meta = {"chunk_size": self._chunk_size, "columns": list(COLUMNS), "chunks": self._chunks}
+        tmp_file = os.path.join(self._path, "meta.json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(meta, f)
+        np.save(os.path.join(self._path, "track_chunks.npy"), self._track_chunks)
+        os.replace(tmp_file, os.path.join(self._path, "meta.json"))
+
+    def _chunk_column(self, chunk: int, name: str) -> np.ndarray:
+        """Memory-mapped column of a chunk
+        """
+        key = (chunk, name)
+        column = self._columns.get(key)
+        if column is None:
+            file_name = os.path.join(self._path, self._chunks[chunk]["name"], f"{name}.npy")
+            column = np.load(file_name, mmap_mode="r")
+            self._columns[key] = column
+        return column
+
+    def __len__(self) -> int:
+        """Number of rows written (buffered rows excluded)
+        """
+        return sum(c["rows"] for c in self._chunks)
+
+    @property
+    def num_chunks(self) -> int:
+        """Number of chunks on disk
+        Returns:
+            int: chunks' count
+        """
+        return len(self._chunks)
+
+    def append(self, frame: int, outputs: np.ndarray | list[list[float]]) -> None:
+        """Append results of one frame
+        Args:
+            frame (int): frame index
+            outputs (np.ndarray | list): rows of [x0, y0, x1, y1, conf, cls(, track_id)]
+        """
+        self.extend(ResultSink.to_records(frame, outputs))
+
+    def extend(self, records: np.ndarray) -> None:
+        """Bulk append rows
+        Args:
+            records (np.ndarray): RECORD_DTYPE rows in non-decreasing frame order
+        """
+        if self._mode == "r":
+            raise Exception("ResultStore was opened read-only.")
+        if len(records) == 0:
+            return
+        records = np.asarray(records, dtype=RECORD_DTYPE)
+        # range queries binary search the frame column, out of order rows would be missed
+        frames = records["frame"]
+        if np.any(frames[1:] < frames[:-1]) or (self._last_frame is not None and frames[0] < self._last_frame):
+            raise Exception(f"Frames must be appended in non-decreasing order, last stored frame is "
+                            f"{self._last_frame}, got {frames.tolist()[:10]}.")
+        self._last_frame = int(frames[-1])
+        self._buffer.append(records)
+        self._buffered_rows += len(records)
+        while self._buffered_rows >= self._chunk_size:
+            self._write_chunk(self._chunk_size)
+
+    def _write_chunk(self, rows: int) -> None:
+        """Write the first rows of the buffer as a new chunk
+        """
+        records = np.concatenate(self._buffer)
+        chunk, rest = records[:rows], records[rows:]
+        self._buffer = [rest] if len(rest) else []
+        self._buffered_rows = len(rest)
+
+        index = len(self._chunks)
+        name = f"chunk_{index:06d}"
+        chunk_dir = os.path.join(self._path, name)
+        os.makedirs(chunk_dir, exist_ok=True)
+        for column in COLUMNS:
+            np.save(os.path.join(chunk_dir, f"{column}.npy"), np.ascontiguousarray(chunk[column]))
+
+        # rows grouped by track id, stable so each group stays in frame order
+        order = np.argsort(chunk["track_id"], kind="stable")
+        keys, starts = np.unique(chunk["track_id"][order], return_index=True)
+        np.save(os.path.join(chunk_dir, "track_order.npy"), order.astype(np.int64))
+        np.save(os.path.join(chunk_dir, "track_keys.npy"), keys.astype(np.int64))
+        np.save(os.path.join(chunk_dir, "track_starts.npy"), np.append(starts, len(chunk)).astype(np.int64))
+
+        self._chunks.append({
+            "name": name,
+            "rows": int(len(chunk)),
+            "first_frame": int(chunk["frame"][0]),
+            "last_frame": int(chunk["frame"][-1]),
+        })
+        new_pairs = np.stack([keys, np.full(len(keys), index)], axis=1)
+        self._track_chunks = self._sort_pairs(np.concatenate([self._track_chunks, new_pairs]))
+        self._update_ranges()
+        self._write_meta()
+
+    def flush(self) -> None:
+        """Write buffered rows as a (possibly short) chunk
+        """
+        if self._buffered_rows:
+            self._write_chunk(self._buffered_rows)
+
+    def close(self) -> None:
+        """Flush and drop memory maps
+        """
+        if self._mode != "r":
+            self.flush()
+        self._columns.clear()
+
+    def _gather(self, parts: list[tuple[int, np.ndarray | slice]]) -> dict[str, np.ndarray]:
+        """Concatenate selected rows of chunks into columns
+        """
+        result = {}
+        for column in COLUMNS:
+            arrays = [self._chunk_column(chunk, column)[rows] for chunk, rows in parts]
+            if arrays:
+                result[column] = np.concatenate(arrays) if len(arrays) > 1 else np.asarray(arrays[0])
+            else:
+                empty = np.zeros(0, dtype=RECORD_DTYPE)
+                result[column] = empty[column]
+        return result
+
+    def frames(self, start: int, stop: int | None = None) -> dict[str, np.ndarray]:
+        """Rows of frames in [start, stop)
+        Args:
+            start (int): first frame
+            stop (int | None): frame after the last one, defaults to start + 1
+        Returns:
+            dict[str, np.ndarray]: columns frame, track_id, xyxy, conf and cls
+        """
+        stop = start + 1 if stop is None else stop
+        first = int(np.searchsorted(self._last_frames, start, side="left"))
+        last = int(np.searchsorted(self._first_frames, stop, side="left"))
+        parts = []
+        for chunk in range(first, last):
+            frame_column = self._chunk_column(chunk, "frame")
+            lo = int(np.searchsorted(frame_column, start, side="left"))
+            hi = int(np.searchsorted(frame_column, stop, side="left"))
+            if lo < hi:
+                parts.append((chunk, slice(lo, hi)))
+        return self._gather(parts)
+
+    def track(self, track_id: int) -> dict[str, np.ndarray]:
+        """Every row of one track in frame order
+        Args:
+            track_id (int): track id
+        Returns:
+            dict[str, np.ndarray]: columns frame, track_id, xyxy, conf and cls
+        """
+        ids = self._track_chunks[:, 0]
+        lo = int(np.searchsorted(ids, track_id, side="left"))
+        hi = int(np.searchsorted(ids, track_id, side="right"))
+        parts = []
+        for chunk in self._track_chunks[lo:hi, 1].tolist():
+            keys = self._chunk_column(chunk, "track_keys")
+            position = int(np.searchsorted(keys, track_id))
+            starts = self._chunk_column(chunk, "track_starts")
+            order = self._chunk_column(chunk, "track_order")
+            parts.append((chunk, np.asarray(order[starts[position]:starts[position + 1]])))
+        return self._gather(parts)
+
+    def track_ids(self) -> np.ndarray:
+        """Every track id in the store
+        Returns:
+            np.ndarray: sorted unique track ids
+        """
+        return np.unique(self._track_chunks[:, 0])
+
+    def __del__(self) -> None:
+        """Release Resources
+        """
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "ResultStore":
+        """Returns Conext for "with" block usage
+        Returns:
+            ResultStore: store object
+        """
+        return self
+
+    def __exit__(self, exc_type: None, exc_value: None,
+                 traceback: None) -> None:
+        """Flush before exiting the "with" block
+        Args:
+            exc_type (NoneType): Exception type if any
+            exc_value (NoneType): Exception value if any
+            traceback (NoneType): Traceback of Exception
+        """
+        self.close()
@@ -0,0 +1,220 @@
+from __future__ import annotations
+import math
+import multiprocessing as mp
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from inference.interface.reader import ReaderInterface
+
+
+@dataclass
+class FrameDescriptor:
+    """Lightweight handle sent through the descriptor queue instead of the frame
+    """
+    slot: int
+    index: int
+    shape: tuple[int, ...]
+
+
+class SharedFrameRing:
+    """
+    Ring of fixed size frame slots in shared memory.
+    The producer writes a frame into a free slot and only the small FrameDescriptor
+    goes through a queue. A slot is recycled once the consumer calls ack().
+    The ring can be passed to multiprocessing.Process args, workers re-attach by name.
+    """
+    def __init__(self,
+                 num_slots: int,
+                 shape: tuple[int, ...],
+                 dtype: np.dtype = np.uint8,
+                 ctx: mp.context.BaseContext | None = None) -> None:
+        """Initiate SharedFrameRing object
+        Args:
+            num_slots (int): number of frames that can be in flight
+            shape (tuple[int, ...]): largest frame (or batch) shape a slot has to hold
+            dtype (np.dtype): dtype of frames
+            ctx (BaseContext | None): multiprocessing context used for the queues
+        """
+        ctx = mp.get_context() if ctx is None else ctx
+
+        self._num_slots = num_slots
+        self._shape = tuple(shape)
+        self._dtype = np.dtype(dtype)
+        self._slot_bytes = int(math.prod(self._shape)) * self._dtype.itemsize
+
+        self._shm = shared_memory.SharedMemory(create=True, size=self._slot_bytes * num_slots)
+        self._is_owner = True
+        self._free = ctx.Queue()
+        self._ready = ctx.Queue()
+        for slot in range(num_slots):
+            self._free.put(slot)
+
+        self._buffer = None
+        self._map_buffer()
+
+    def _map_buffer(self) -> None:
+        """Create the numpy view over the shared block
+        """
+        self._buffer = np.ndarray((self._num_slots, self._slot_bytes), dtype=np.uint8,
+                                  buffer=self._shm.buf)
+
+    def __getstate__(self) -> dict:
+        """Pickle everything but the mapping itself
+        """
+        state = self.__dict__.copy()
+        state['_shm'] = self._shm.name
+        state['_buffer'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Re-attach to the shared block by name
+        """
+        self.__dict__.update(state)
+        self._shm = shared_memory.SharedMemory(name=state['_shm'])
+        # only the creating process unlinks the block
+        self._is_owner = False
+        self._map_buffer()
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block
+        Returns:
+            str: name of shared memory
+        """
+        return self._shm.name
+
+    @property
+    def num_slots(self) -> int:
+        """Number of slots
+        Returns:
+            int: number of slots in the ring
+        """
+        return self._num_slots
+
+    def view(self, slot: int, shape: tuple[int, ...] | None = None) -> np.ndarray:
+        """Zero-copy view on a slot
+        Args:
+            slot (int): slot index
+            shape (tuple[int, ...] | None): shape of the frame, defaults to the slot shape
+        Returns:
+            np.ndarray: frame backed by shared memory
+        """
+        shape = self._shape if shape is None else tuple(shape)
+        nbytes = int(math.prod(shape)) * self._dtype.itemsize
+        return self._buffer[slot, :nbytes].view(self._dtype).reshape(shape)
+
+    def acquire(self, timeout: float | None = None) -> int:
+        """Take a free slot, blocks until a consumer acknowledged one
+        Args:
+            timeout (float | None): seconds to wait, None waits forever
+        Returns:
+            int: free slot index
+        """
+        return self._free.get(timeout=timeout)
+
+    def publish(self, slot: int, index: int, shape: tuple[int, ...] | None = None) -> None:
+        """Hand a filled slot to the consumers
+        Args:
+            slot (int): slot index returned by acquire
+            index (int): frame index in the source
+            shape (tuple[int, ...] | None): shape of the frame written into the slot
+        """
+        shape = self._shape if shape is None else tuple(shape)
+        self._ready.put(FrameDescriptor(slot, index, shape))
+
+    def put(self, frame: np.ndarray, index: int, timeout: float | None = None) -> None:
+        """Copy a frame into a free slot and publish it
+        Args:
+            frame (np.ndarray): frame (or batch) to send
+            index (int): frame index in the source
+            timeout (float | None): seconds to wait for a free slot
+        """
+        if frame.nbytes > self._slot_bytes:
+            raise Exception(f"Frame of shape {frame.shape} does not fit a slot of shape {self._shape}.")
+        slot = self.acquire(timeout)
+        np.copyto(self.view(slot, frame.shape), frame, casting='no')
+        self.publish(slot, index, frame.shape)
+
+    def get(self, timeout: float | None = None) -> tuple[FrameDescriptor, np.ndarray] | None:
+        """Receive the next frame
+        Args:
+            timeout (float | None): seconds to wait, None waits forever
+        Returns:
+            tuple[FrameDescriptor, np.ndarray] | None: descriptor and shared view, None at end of stream
+        """
+        desc = self._ready.get(timeout=timeout)
+        if desc is None:
+            return None
+        return desc, self.view(desc.slot, desc.shape)
+
+    def ack(self, desc: FrameDescriptor | int) -> None:
+        """Return a slot to the producer, the view must not be used afterwards
+        Args:
+            desc (FrameDescriptor | int): descriptor or slot index to recycle
+        """
+        self._free.put(desc.slot if isinstance(desc, FrameDescriptor) else desc)
+
+    def close(self, num_consumers: int = 1) -> None:
+        """Signal end of stream to every consumer
+        Args:
+            num_consumers (int): number of consumer processes reading the ring
+        """
+        for _ in range(num_consumers):
+            self._ready.put(None)
+
+    def feed(self, reader: ReaderInterface, num_consumers: int = 1) -> int:
+        """Push every frame of a reader through the ring, then signal end of stream
+        Args:
+            reader (ReaderInterface): source of frames
+            num_consumers (int): number of consumer processes reading the ring
+        Returns:
+            int: number of frames sent
+        """
+        count = 0
+        try:
+            for frame in reader:
+                if frame is None:
+                    break
+                self.put(frame, count)
+                count += 1
+        finally:
+            self.close(num_consumers)
+        return count
+
+    def release(self) -> None:
+        """Release Resources, the owner also unlinks the block
+        """
+        if self._shm is None:
+            return
+        self._buffer = None
+        self._shm.close()
+        if self._is_owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __del__(self) -> None:
+        """Release Resources
+        """
+        try:
+            self.release()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "SharedFrameRing":
+        """Returns Conext for "with" block usage
+        Returns:
+            SharedFrameRing: ring object
+        """
+        return self
+
+    def __exit__(self, exc_type: None, exc_value: None,
+                 traceback: None) -> None:
+        """Release resources before exiting the "with" block
+        Args:
+            exc_type (NoneType): Exception type if any
+            exc_value (NoneType): Exception value if any
+            traceback (NoneType): Traceback of Exception
+        """
+        self.release()
@@ -1 +1,2 @@
-from .sorting import get_sorted_alpanumeric_files
\ No newline at end of file
+from .sorting import get_sorted_alpanumeric_files, iter_sorted_alphanumeric_files, sorted_alphanumeric
+from .signature import source_signature
@@ -0,0 +1,17 @@
+from __future__ import annotations
+import os
+
+
+def source_signature(files: list[str]) -> tuple[int, int]:
+    """Cheap change detector for a source
+    Args:
+        files (list[str]): files of the source
+    Returns:
+        tuple[int, int]: latest mtime in ns and total size in bytes
+    """
+    mtime, size = 0, 0
+    for file in files:
+        stat = os.stat(file)
+        mtime = max(mtime, stat.st_mtime_ns)
+        size += stat.st_size
+    return mtime, size
@@ -1,18 +1,147 @@
 from __future__ import annotations
 import re
 import os
+import json
+from typing import Iterator
+
+_DIGITS = re.compile('([0-9]+)')
+
+
+def alphanumeric_key(text: str) -> list[str | int]:
+    """Natural sort key, digit runs compare as numbers and the rest case-insensitively
+    """
+    parts = _DIGITS.split(text.lower())
+    # split with a capture group puts the digit runs at odd positions
+    parts[1::2] = map(int, parts[1::2])
+    return parts
+
 
 def sorted_alphanumeric(data: list[str]) -> list[str]:
-    convert = lambda text: int(text) if text.isdigit() else text.lower()
-    alphanum_key = lambda key: [convert(c) for c in re.split('([0-9]+)', key)]
-    return sorted(data, key=alphanum_key)
+    return sorted(data, key=alphanumeric_key)
+
 
+def _has_extension(name: str, extensions: list[str] | tuple[str] | set[str]) -> bool:
+    return name.rpartition('.')[2] in extensions
 
-def get_sorted_alpanumeric_files(data_dir: list[str], extensions: list[str] | tuple[str] | set[str]) -> list[str]:
+
+def _scan_dir(path: str) -> list[os.DirEntry]:
+    """List a directory, unreadable paths are skipped like os.walk does
+    """
+    try:
+        with os.scandir(path) as it:
+            return list(it)
+    except OSError:
+        return []
+
+
+def scan_files(data_dir: str, extensions: list[str] | tuple[str] | set[str],
+               dir_mtimes: dict[str, int] | None = None) -> list[str]:
+    """Unsorted recursive listing with os.scandir
+    Args:
+        data_dir (str): root directory
+        extensions (list[str] | tuple[str] | set[str]): extensions without dot
+        dir_mtimes (dict[str, int] | None): if given, filled with mtime of every visited directory
+    Returns:
+        list[str]: matching file paths
+    """
+    extensions = set(extensions)
     ret_files = []
-    for root, dirs, files in os.walk(data_dir):
-        for file in files:
-            ext = file.split('.')[-1]
-            if ext in extensions:
-                ret_files.append(os.path.join(root, file))
-    return sorted_alphanumeric(ret_files)
+    stack = [data_dir]
+    while stack:
+        root = stack.pop()
+        if dir_mtimes is not None:
+            try:
+                dir_mtimes[root] = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+        for entry in _scan_dir(root):
+            if entry.is_dir():
+                # symlinked directories are not followed, same as os.walk
+                if not entry.is_symlink():
+                    stack.append(entry.path)
+            elif _has_extension(entry.name, extensions):
+                ret_files.append(entry.path)
+    return ret_files
+
+
+def _load_manifest(manifest_path: str, data_dir: str,
+                   extensions: list[str] | tuple[str] | set[str]) -> list[str] | None:
+    """Returns the cached listing if no directory changed since it was written
+    """
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get('root') != data_dir or manifest.get('extensions') != sorted(extensions):
+        return None
+    # adding or removing an entry always touches the parent directory's mtime
+    for path, mtime in manifest['dirs'].items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return None
+        except OSError:
+            return None
+    return manifest['files']
+
+
+def get_sorted_alpanumeric_files(data_dir: str, extensions: list[str] | tuple[str] | set[str],
+                                 manifest_path: str | None = None) -> list[str]:
+    """Recursive listing of files in natural order
+    Args:
+        data_dir (str): root directory
+        extensions (list[str] | tuple[str] | set[str]): extensions without dot
+        manifest_path (str | None): if given, the sorted listing is saved there and reused
+        while no directory mtime under data_dir changed
+    Returns:
+        list[str]: sorted file paths
+    """
+    if manifest_path is not None:
+        files = _load_manifest(manifest_path, data_dir, extensions)
+        if files is not None:
+            return files
+
+    dir_mtimes = {} if manifest_path is not None else None
+    files = sorted_alphanumeric(scan_files(data_dir, extensions, dir_mtimes))
+
+    if manifest_path is not None:
+        manifest = {
+            'root': data_dir,
+            'extensions': sorted(extensions),
+            'dirs': dir_mtimes,
+            'files': files,
+        }
+        tmp_path = manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+    return files
+
+
+def iter_sorted_alphanumeric_files(data_dir: str,
+                                   extensions: list[str] | tuple[str] | set[str]) -> Iterator[str]:
+    """Lazy recursive listing in natural order, see ImageReader(lazy=True)
+    Every directory is listed and sorted on its own and subdirectories are walked where
+    they fall in that order, so the first file is yielded once the directories on its path
+    are listed instead of the whole tree. A flat directory is still listed in full first.
+    The sorted entries of the current directory and its ancestors are kept while walking.
+    This matches get_sorted_alpanumeric_files when file names do not share a prefix with
+    sibling directory names (e.g. frames under sequence dirs).
+    Args:
+        data_dir (str): root directory
+        extensions (list[str] | tuple[str] | set[str]): extensions without dot
+    Yields:
+        str: file paths
+    """
+    extensions = set(extensions)
+    entries = _scan_dir(data_dir)
+    entries.sort(key=lambda entry: alphanumeric_key(entry.path))
+    for entry in entries:
+        if entry.is_dir():
+            if not entry.is_symlink():
+                yield from iter_sorted_alphanumeric_files(entry.path, extensions)
+        elif _has_extension(entry.name, extensions):
+            yield entry.path
@@ -0,0 +1,53 @@
+import asyncio
+import gc
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from inference.opencv import ImageReader
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    for i in range(20):
+        cv2.imwrite(str(tmp_path / f'{i}.png'), np.full((8, 8, 3), i, dtype=np.uint8))
+    return str(tmp_path)
+
+
+async def _decode_thread_stopped(timeout=2.0):
+    """Waits with the event loop still running, closing the loop ends the thread anyway"""
+    for _ in range(int(timeout / 0.02)):
+        if not any(thread.name == 'ImageReader-decode' for thread in threading.enumerate()):
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+def test_abandoned_async_iteration_stops_decode_thread(image_dir):
+    async def main():
+        reader = ImageReader(image_dir, async_queue_size=2)
+        frames = []
+        async for frame in reader:
+            frames.append(frame[0, 0, 0])
+            if len(frames) == 2:
+                break
+        del reader
+        gc.collect()
+        return frames, await _decode_thread_stopped()
+
+    assert asyncio.run(main()) == ([0, 1], True)
+
+
+def test_async_iteration_restarts_and_release_stops_thread(image_dir):
+    async def main():
+        reader = ImageReader(image_dir, async_queue_size=2)
+        async for frame in reader:
+            break
+        async for frame in reader:
+            break
+        reader.release()
+        return frame[0, 0, 0], await _decode_thread_stopped()
+
+    assert asyncio.run(main()) == (0, True)
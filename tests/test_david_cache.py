@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+from inference.dataset import DavidDataset
+
+
+def _box(x, y, w, h):
+    return {'box': {'x': x, 'y': y, 'width': w, 'height': h}}
+
+
+def _write_frames(path, frames):
+    for i, rows in enumerate(frames):
+        with open(os.path.join(path, f'frame_{i}.json'), 'w') as f:
+            json.dump(rows, f)
+
+
+def _frames(integral):
+    value = (lambda v: v) if integral else (lambda v: v + 0.25)
+    return [
+        [
+            {'tracking_id': '1', 'visible-box': _box(value(10), 20, 30, 40), 'full-box': _box(5, value(6), 70, 80),
+             'head-box': _box(12, 14, 8, 9),
+             'body-key-points': {'0': {'x': value(11), 'y': 21}, '10': {'x': 3, 'y': 4}}},
+            # no head box and no key points
+            {'tracking_id': '2', 'visible-box': _box(1, 2, 3, 4), 'full-box': _box(1, 2, 3, 4)},
+            # rows without tracking id are skipped
+            {'tracking_id': '', 'visible-box': _box(0, 0, 1, 1)},
+        ],
+        [],
+        [{'tracking_id': '3', 'visible-box': _box(7, 8, 9, 10), 'full-box': _box(7, 8, 9, 10),
+          'head-box': _box(7, 8, 2, 2), 'body-key-points': {'2': {'x': 5, 'y': value(6)}}}],
+    ]
+
+
+def _as_tuples(frame):
+    return [(p.id, p.visible.xywh, p.full.xywh, p.head.xywh, p.key_point) for p in frame]
+
+
+@pytest.mark.parametrize('integral', [True, False])
+def test_compiled_matches_aggregate(tmp_path, integral):
+    data_dir = tmp_path / 'annotations'
+    data_dir.mkdir()
+    _write_frames(data_dir, _frames(integral))
+
+    expected = list(DavidDataset(str(data_dir), (3, 4)))
+    compiled = list(DavidDataset(str(data_dir), (3, 4), compiled=True, cache_dir=str(tmp_path / 'cache')))
+
+    # non-integral sources are stored as float64, values are exact but ints come back as floats
+    assert [_as_tuples(frame) for frame in compiled] == [_as_tuples(frame) for frame in expected]
+    if not integral:
+        return
+    for got, want in zip(compiled, expected):
+        for got_person, want_person in zip(got, want):
+            for field in ('visible', 'full', 'head'):
+                assert [type(v) for v in getattr(got_person, field).xywh] == \
+                    [type(v) for v in getattr(want_person, field).xywh]
+            for name, xy in want_person.key_point.items():
+                assert [type(v) for v in got_person.key_point[name]] == [type(v) for v in xy]
+
+
+def test_default_cache_dir_is_outside_the_dataset(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'annotations'
+    data_dir.mkdir()
+    _write_frames(data_dir, _frames(True))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'user-cache'))
+
+    dataset = DavidDataset(str(data_dir), compiled=True)
+    assert sorted(os.listdir(data_dir)) == ['frame_0.json', 'frame_1.json', 'frame_2.json']
+    assert dataset.cache.cache_dir.startswith(str(tmp_path / 'user-cache'))
@@ -0,0 +1,93 @@
+import sys
+import time
+import types
+from contextlib import nullcontext
+
+import numpy as np
+import pytest
+
+from inference.pipeline.detection import build_detection_pipeline, make_batch_detector
+
+
+class FakeTensor:
+    def __init__(self, array):
+        self.array = np.asarray(array)
+
+    def to(self, device):
+        return self
+
+    def half(self):
+        return FakeTensor(self.array.astype(np.float16))
+
+    def float(self):
+        return FakeTensor(self.array.astype(np.float32))
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+    def __getitem__(self, index):
+        return FakeTensor(self.array[index])
+
+
+class StubModel:
+    """One person box in the middle of the input and one box of class 1"""
+    def eval(self):
+        return self
+
+    def __call__(self, x):
+        batch, _, height, width = x.array.shape
+        rows = np.zeros((batch, 2, 7), dtype=np.float32)
+        rows[:, 0] = [width / 2, height / 2, width / 4, height / 4, 0.9, 0.9, 0.1]
+        rows[:, 1] = [width / 4, height / 4, width / 8, height / 8, 0.9, 0.1, 0.9]
+        return (FakeTensor(rows),)
+
+
+@pytest.fixture(autouse=True)
+def fake_torch(monkeypatch):
+    torch = types.ModuleType('torch')
+    torch.from_numpy = FakeTensor
+    torch.no_grad = nullcontext
+    monkeypatch.setitem(sys.modules, 'torch', torch)
+
+
+def _frames(count=5):
+    return [np.full((48, 64, 3), i, dtype=np.uint8) for i in range(count)]
+
+
+def test_detection_pipeline_runs_on_stub_model():
+    pipeline = build_detection_pipeline(StubModel(), img_size=32, queue_size=2)
+    outputs = list(pipeline.run(_frames()))
+    assert len(outputs) == 5
+    for output in outputs:
+        # class 1 is filtered out, the person box maps back to the middle of the 64x48 frame as a 16x16 box
+        assert output.shape == (1, 7)
+        np.testing.assert_allclose(output[0, :4], [24, 16, 40, 32], atol=1)
+        assert output[0, 5] == 0 and output[0, 6] == -1
+
+
+def test_batch_detector_runs_on_stub_model():
+    detect = make_batch_detector(StubModel(), max_batch_size=4, img_size=32)
+    dets = detect(_frames(3))
+    assert [len(det.pred) for det in dets] == [1, 1, 1]
+    assert dets[0].cls.tolist() == [0]
+
+
+class InputEchoModel(StubModel):
+    """Slow model with the box position taken from the input, so reused input slots show up"""
+    def __call__(self, x):
+        time.sleep(0.005)
+        batch, _, height, width = x.array.shape
+        value = float(x.array[0, 0, height // 2, width // 2])
+        rows = np.zeros((batch, 1, 6), dtype=np.float32)
+        rows[:, 0] = [8 + 16 * value, height / 2, 4, 4, 0.9, 0.9]
+        return (FakeTensor(rows),)
+
+
+def test_detection_pipeline_keeps_inputs_of_frames_in_flight():
+    frames = [np.full((32, 32, 3), 10 * i, dtype=np.uint8) for i in range(20)]
+    pipeline = build_detection_pipeline(InputEchoModel(), img_size=32, queue_size=2, preprocess_workers=2)
+    centers = [(output[0, 0] + output[0, 2]) / 2 for output in pipeline.run(frames)]
+    np.testing.assert_allclose(centers, [8 + 16 * 10 * i / 255 for i in range(20)], atol=0.01)
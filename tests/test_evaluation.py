@@ -0,0 +1,31 @@
+import numpy as np
+
+from inference.evaluation import MOTAccumulator
+
+BOX_A = np.array([[0, 0, 10, 10]])
+BOX_B = np.array([[100, 100, 110, 110]])
+
+
+def test_pred_track_is_not_matched_to_two_gt_tracks():
+    acc = MOTAccumulator()
+    acc.update([1], BOX_A, [7], BOX_A)
+    acc.update([2], BOX_B, [7], BOX_B)
+    # both gt tracks are visible again, pred 7 can only cover one of them
+    acc.update([1, 2], np.r_[BOX_A, BOX_B], [7], BOX_B)
+
+    metrics = acc.compute()
+    assert metrics["num_matches"] == 3
+    assert metrics["num_matches"] <= metrics["num_pred"]
+    assert metrics["false_positives"] == 0
+    assert metrics["misses"] == 1
+    assert metrics["mota"] == 1.0 - 1 / 4
+
+
+def test_id_switch_is_counted_after_pred_moved_to_another_gt():
+    acc = MOTAccumulator()
+    acc.update([1], BOX_A, [7], BOX_A)
+    acc.update([2], BOX_B, [7], BOX_B)
+    # gt 1 was last covered by pred 7, now by pred 8
+    acc.update([1], BOX_A, [8], BOX_A)
+
+    assert acc.compute()["id_switches"] == 1
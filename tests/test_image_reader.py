@@ -0,0 +1,34 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from inference.opencv import ImageReader
+
+
+@pytest.fixture
+def image_tree(tmp_path):
+    for sequence in ('seq2', 'seq10'):
+        os.makedirs(tmp_path / sequence)
+        for i in (1, 2, 10):
+            frame = np.full((8, 12, 3), i, dtype=np.uint8)
+            cv2.imwrite(str(tmp_path / sequence / f'{i}.png'), frame)
+    return str(tmp_path)
+
+
+def test_lazy_listing_reads_the_same_frames(image_tree):
+    eager = ImageReader(image_tree)
+    lazy = ImageReader(image_tree, lazy=True)
+    assert lazy.info['num_files'] is None
+
+    expected = [frame[0, 0, 0] for frame in eager]
+    assert [frame[0, 0, 0] for frame in lazy] == expected == [1, 2, 10, 1, 2, 10]
+    assert lazy.info['num_files'] == 6
+    # a second pass reuses the listed files
+    assert [frame[0, 0, 0] for frame in lazy] == expected
+
+
+def test_lazy_listing_rejects_cache(image_tree, tmp_path):
+    with pytest.raises(Exception, match='lazy'):
+        ImageReader(image_tree, lazy=True, cache_dir=str(tmp_path / 'cache'))
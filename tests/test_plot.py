@@ -0,0 +1,18 @@
+import numpy as np
+
+from inference.opencv.writer.plot import draw_detections, draw_xyxy_box
+
+
+def test_draw_detections_matches_per_box_drawing():
+    rng = np.random.default_rng(0)
+    xy = rng.integers(0, 300, (50, 2))
+    boxes = np.c_[xy, xy + rng.integers(10, 100, (50, 2))]
+    ids = rng.integers(0, 20, 50)
+
+    expected = np.full((400, 400, 3), 90, dtype=np.uint8)
+    for box, box_id in zip(boxes, ids):
+        draw_xyxy_box(expected, box, str(box_id), box_id)
+    image = np.full((400, 400, 3), 90, dtype=np.uint8)
+    draw_detections(image, boxes, ids)
+
+    np.testing.assert_array_equal(image, expected)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from inference.opencv.writer.base_writer import Writer
+from inference.results import ResultStore
+
+
+def _run(output_dir, frames=5):
+    writer = Writer(name='seq.mp4', width=32, height=24, fps=10, output_dir=str(output_dir), result_format='store')
+    for frame in range(frames):
+        writer.save_results(np.array([[0, 0, 10, 10, 0.9, 0, 1], [5, 5, 15, 15, 0.8, 0, 2]]), frame)
+    writer.release()
+
+
+def test_writer_replaces_store_of_previous_run(tmp_path):
+    _run(tmp_path)
+    _run(tmp_path)
+    with ResultStore(str(tmp_path / 'seq_result.store')) as store:
+        assert len(store) == 10
+        assert store.frames(3, 5)['frame'].tolist() == [3, 3, 4, 4]
+        assert store.track(2)['frame'].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_append_rejects_earlier_frames(tmp_path):
+    with ResultStore(str(tmp_path / 'store'), mode='a', chunk_size=4) as store:
+        store.append(3, [[0, 0, 1, 1, 0.5, 0, 1]])
+        with pytest.raises(Exception, match='non-decreasing'):
+            store.append(2, [[0, 0, 1, 1, 0.5, 0, 1]])
+    with ResultStore(str(tmp_path / 'store'), mode='a') as store:
+        with pytest.raises(Exception, match='non-decreasing'):
+            store.append(0, [[0, 0, 1, 1, 0.5, 0, 1]])
+        store.append(3, [[0, 0, 1, 1, 0.5, 0, 1]])
+    with ResultStore(str(tmp_path / 'store')) as store:
+        assert store.frames(0, 10)['frame'].tolist() == [3, 3]
+
+
+def test_writer_reopens_result_files_after_release(tmp_path):
+    writer = Writer(name='seq.mp4', width=32, height=24, fps=10, output_dir=str(tmp_path))
+    writer.save_results(np.array([[0, 0, 10, 10, 0.9, 0, 1]]))
+    writer.save_json([{'id': 1}])
+    writer.release()
+    # new files, numbered from the first frame again
+    writer.save_results(np.array([[0, 0, 10, 10, 0.9, 0, 1]]))
+    writer.save_json([{'id': 1}])
+    writer.release()
+    with open(tmp_path / 'seq_result.jsonl') as f:
+        assert f.read().count('"frame": 0') == 1
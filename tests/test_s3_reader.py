@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+import pytest
+
+boto3 = pytest.importorskip('boto3')
+moto = pytest.importorskip('moto')
+
+from inference.opencv import S3ImageReader  # noqa: E402
+
+BUCKET = 'frames-bucket'
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    with moto.mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        for i in (0, 1, 2, 10):
+            frame = np.full((16, 24, 3), i, dtype=np.uint8)
+            client.put_object(Bucket=BUCKET, Key=f'seq/{i}.png', Body=cv2.imencode('.png', frame)[1].tobytes())
+        client.put_object(Bucket=BUCKET, Key='seq/notes.txt', Body=b'not an image')
+        yield client
+
+
+def test_reads_images_in_alphanumeric_order(s3_client):
+    reader = S3ImageReader(f's3://{BUCKET}/seq', client=s3_client, workers=2)
+    frames = list(reader)
+    assert [int(frame[0, 0, 0]) for frame in frames] == [0, 1, 2, 10]
+    assert frames[0].shape == (16, 24, 3)
+
+
+def test_iterates_again_after_release(s3_client):
+    with S3ImageReader(f's3://{BUCKET}/seq', client=s3_client, workers=2) as reader:
+        assert len(list(reader)) == 4
+    # __exit__ released the download pool, a new iteration recreates it
+    assert [int(frame[0, 0, 0]) for frame in reader] == [0, 1, 2, 10]